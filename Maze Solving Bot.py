@@ -8,13 +8,75 @@
 # Note: Extra static data that is constant across all the maps is used if competition mode is enabled
 # The robot works without it, it just provided a speed boost to the overall mapping.
 # =================================================
+import math
 from enum import IntEnum
 from vexcode import *
 
+# heapq and array are only used by the options below that are off by default, such as the fastest route planner and packed storage
+# They are imported only if they are available, so the project still runs on a platform without them as long as those options are left off
+try:
+    import heapq
+except ImportError:
+    heapq = None
+try:
+    from array import array
+except ImportError:
+    array = None
+
 # COMPETITION_MODE should be enabled if used in the dynamic wall maze or wall-maze playground modes
 # The robot functions correctly without it but it provided a speed boost if used
 COMPETITION_MODE = True
 
+# MAZE_STORAGE picks how the maze is stored. 'nodes' links a cell object to node objects at each of its corners
+# 'packed' keeps every wall once in flat integer arrays, which uses far less memory and is faster on very large mazes
+# 'sparse' only stores the walls the robot has found out about, so it starts instantly and its memory grows with the explored area
+MAZE_STORAGE = 'nodes'
+
+# ROUTE_PLANNER picks how the final route through the maze is found. 'shortest' finds the route through the fewest cells
+# 'fastest' finds the route that takes the least time to drive, counting the time spent turning as well as the time spent driving
+# 'junctions' finds the route through the fewest cells like 'shortest', but searches the maze's junction graph so only junctions and dead ends are visited
+ROUTE_PLANNER = 'shortest'
+
+# EXPLORATION picks how the robot maps the maze. 'tremaux' uses the tremaux algorithm, scanning every cell it drives into
+# 'frontier' always drives to the nearest cell with walls that are not known, taking turning into account, and scans there
+EXPLORATION = 'tremaux'
+
+# EARLY_FINISH stops exploring as soon as the shortest route from the start to the end is certain, even if some walls are still not known
+# The final route is then found only through walls known to be open. Both explorations only scan, and tremaux only drives into, cells that could still shorten the route
+# Until a route through walls known to be open has been found, both explorations head for the end first, choosing the way that is closest to it
+EARLY_FINISH = False
+
+# TIME_BUDGET is the number of seconds exploration may take, timed with the brain's timer, or None for no limit
+# When the time runs out the robot stops exploring and uses the best route it has found through walls known to be open,
+# printing how much longer than the shortest route it could be. As with EARLY_FINISH the robot heads for the end first, so a route is known early,
+# and then only looks at cells that could still improve it
+TIME_BUDGET = None
+
+# PERFECT_MAZE should only be enabled if the maze is known to have no loops, so that there is exactly one route between any two cells
+# The robot then knows a wall must be present between two cells that are already joined by another route, without having to look at it
+PERFECT_MAZE = False
+
+# PRUNE_REGIONS stops the robot exploring parts of the maze that can not be on any route from the start to the end, such as dead end branches
+# Every wall a route could use is still found, so the shortest route is the same, but walls in the parts that were skipped are left unknown
+PRUNE_REGIONS = False
+
+# LONG_RANGE_SCANS uses the whole of a distance reading taken while the robot is stopped and square to the walls, rather than only the wall of its own cell
+# Every wall the reading passes through is known to be open, and the wall it stops at to be present, so looking down a corridor maps all of it at once
+# As cells far away become known without being visited, the tremaux algorithm then drives straight to the nearest cell still worth scanning rather than following its marks
+LONG_RANGE_SCANS = False
+
+# SWEEP_SCANS checks the walls of a junction while turning, reading the distance sensor as the robot sweeps past each wall rather than stopping to face it
+# The sweep only stops once, a short turn before the last wall it needs, so the robot spends less time starting and stopping turns
+SWEEP_SCANS = False
+
+# SPEED_RUN has the robot drive the route it found once the maze is mapped, going back to the start first if it is not already there
+# Each straight run of cells along the route is driven as one drive, so the robot only stops at the corners where it has to turn
+SPEED_RUN = False
+
+# SMOOTH_PATHS lets the speed run cut across open parts of the maze in straight lines at any angle, rather than following the route one cell at a time
+# A line is only driven where the whole width of the robot stays clear of every wall that is, or could be, there
+SMOOTH_PATHS = False
+
 
 # The wall enum is used to convert to and from integer values into their corresponding walls
 # This makes referring to specific walls more readable, and easier to change if say one were to switch to a hexagon maze
@@ -25,6 +87,48 @@ class Walls(IntEnum):
     West = 3
 
 
+# These are how far the neighbouring cell through each wall is from a cell, indexed by the wall
+wall_x_offsets = (0, 1, 0, -1)
+wall_y_offsets = (1, 0, -1, 0)
+
+
+# Wall between returns the wall of the cell at (x_pos, y_pos) that leads into the neighbouring cell at (x_next, y_next)
+def wall_between(x_pos, y_pos, x_next, y_next):
+    for wall in Walls:
+        if x_pos + wall_x_offsets[wall] == x_next and y_pos + wall_y_offsets[wall] == y_next:
+            return wall
+
+
+# These are the two ends of each wall of a cell, as offsets in cells from the cell's bottom left corner, indexed by the wall
+wall_ends = (((0, 1), (1, 1)), ((1, 0), (1, 1)), ((0, 0), (1, 0)), ((0, 0), (0, 1)))
+
+
+# Point segment distance returns how far the point is from the nearest point on the line segment between the two ends, with each point given as (x, y)
+def point_segment_distance(point, start, end):
+    x_length = end[0] - start[0]
+    y_length = end[1] - start[1]
+    length_squared = x_length * x_length + y_length * y_length
+    along = 0.0
+    if length_squared > 0:
+        along = max(0.0, min(1.0, ((point[0] - start[0]) * x_length + (point[1] - start[1]) * y_length) / length_squared))
+    x_offset = start[0] + along * x_length - point[0]
+    y_offset = start[1] + along * y_length - point[1]
+    return (x_offset * x_offset + y_offset * y_offset) ** 0.5
+
+
+# Segment distance returns how close the line segment from first_start to first_end comes to the one from second_start to second_end, which is 0 when they cross
+def segment_distance(first_start, first_end, second_start, second_end):
+    # Each segment's ends being on opposite sides of the other segment means the two cross
+    def side(start, end, point):
+        return (end[0] - start[0]) * (point[1] - start[1]) - (end[1] - start[1]) * (point[0] - start[0])
+    if side(first_start, first_end, second_start) * side(first_start, first_end, second_end) < 0:
+        if side(second_start, second_end, first_start) * side(second_start, second_end, first_end) < 0:
+            return 0.0
+    # Otherwise the closest the two come is from an end of one of them to the other
+    return min(point_segment_distance(first_start, second_start, second_end), point_segment_distance(first_end, second_start, second_end),
+               point_segment_distance(second_start, first_start, first_end), point_segment_distance(second_end, first_start, first_end))
+
+
 # The node object can be thought of similar to a corner in the maze. It stores information about its connected nodes and various properties.
 # Analysis of this allow the robot to infer the state of different walls in the maze so the robot doesn't have to travel there
 class Node:
@@ -156,6 +260,11 @@ class Cell:
 
     # When a cells wall state is inferred from the data the maze contains this function is called
     def force_wall(self, wall, amount=2):
+        # A forced wall that was not known before is added to the maze's known wall counts
+        known = self.wall_known(wall)
+        if not known:
+            self.maze.count_known_wall(self.x_position, self.y_position, wall)
+
         # The amount parameter sets how many times that cell should have been visited according to the tremaux algorithm
         for visit in range(amount):
             self.visit_wall(wall)
@@ -178,6 +287,11 @@ class Cell:
             self.top_left_node.south_forced = True
             self.bottom_left_node.north_forced = True
 
+        # The cells either side of the wall are then queued to be checked again, as the forced wall may let more edges be inferred
+        self.maze.mark_wall_dirty(self.x_position, self.y_position, wall)
+        if not known and self.maze.open_listeners:
+            self.maze.notify_wall_opened(self.x_position, self.y_position, wall)
+
     # To see if a cell wall's state has been assigned from context, this function checks the appropriate linked nodes for their forced state and return the value
     def check_forced(self, wall):
         if wall == Walls.North:
@@ -283,7 +397,7 @@ class Cell:
 # The maze is the overall structure of cells and what stores the representation of the real world maze.
 class Maze:
     # The maze constructor creates the variables that will be used to store the nodes and cells inside of the made
-    def __init__(self, width, height):
+    def __init__(self, width, height, region_size=4):
         # The width and height will later be used in the initialize method for setting up the nested lists
         self.width = width
         self.height = height
@@ -291,6 +405,41 @@ class Maze:
         self.cells = []
         self.nodes = []
 
+        # The known walls are counted as they become known, so checking if the whole maze is known does not need to look at every cell
+        # The maze is also split into square regions of region_size cells, and the known walls of each region are counted separately
+        # Only regions with a known wall are stored, so the counts cost nothing to set up however big the maze is. Pruned exploration skips regions with nothing left to find
+        self.total_walls = width * (height + 1) + height * (width + 1)
+        self.known_walls = 0
+        self.region_size = region_size
+        self.region_known_walls = {}
+
+        # The search engine used for pathfinding is created the first time it is needed, then reused for every search after that
+        self.search = None
+
+        # Wall listeners are told whenever a wall that was not present becomes present, so that anything built from the maze's walls can update itself
+        # Each listener has a wall_added(x_pos, y_pos, wall) method. The junction graph is one, created the first time it is asked for
+        self.wall_listeners = []
+        self.junctions = None
+        self.paths = None
+        self.replanner = None
+        self.fields = {}
+
+        # Open listeners are told whenever a wall that was not known becomes known to be open, through a wall_opened(x_pos, y_pos, wall) method
+        # Only the path service needs this, as its tables through walls known to be open are the only thing that an opened wall can change
+        self.open_listeners = []
+
+        # The open components join together cells that have a route between them through walls known to be open
+        # They are only kept once assume_perfect_maze is called, as walls are only inferred from them when the maze has no loops
+        self.components = None
+
+        # The relevant cells are the cells that could be on a route between two cells, created the first time they are asked for
+        self.relevance = None
+
+        # The dirty cells are the (x, y) positions of cells with a wall that has changed since edges were last inferred
+        # The set holds the same positions so that a cell is never queued twice
+        self.dirty_cells = []
+        self.dirty_set = set()
+
     # Initializing the maze with this method sets up the nested lists that hold the structure of the cells
     # It also sets up the nodes (corners) so the cells can be correctly initialized also
     def initialize_maze(self):
@@ -322,6 +471,13 @@ class Maze:
         if x_pos < 0 or y_pos < 0:
             return
 
+        # A wall that was not known before is added to the known wall counts
+        known = self.cells[x_pos][y_pos].wall_known(wall)
+        if not known:
+            self.count_known_wall(x_pos, y_pos, wall)
+        # The wall listeners only need telling about walls that were not already present
+        added = state and self.wall_listeners and not self.wall_present(x_pos, y_pos, wall)
+
         # This calls the appropriate update method on the given cell depending on which wall is being updated
         # It also calls an update method on the cell with the common wall if that cell exists
         if wall == Walls.North:
@@ -341,6 +497,128 @@ class Maze:
             decremented_x = x_pos - 1
             if decremented_x >= 0: self.cells[decremented_x][y_pos].update_east(state)
 
+        # Both cells sharing the wall are queued so that infer_walls checks if any of their edges can now be inferred
+        self.mark_wall_dirty(x_pos, y_pos, wall)
+        if added:
+            self.notify_wall_added(x_pos, y_pos, wall)
+        elif not known and not state and self.open_listeners:
+            self.notify_wall_opened(x_pos, y_pos, wall)
+
+    # Notify wall added tells every wall listener that the given wall of the cell at (x_pos, y_pos) has become present
+    def notify_wall_added(self, x_pos, y_pos, wall):
+        for listener in self.wall_listeners:
+            listener.wall_added(x_pos, y_pos, wall)
+
+    # Notify wall opened tells every open listener that the given wall of the cell at (x_pos, y_pos) has become known to be open
+    def notify_wall_opened(self, x_pos, y_pos, wall):
+        for listener in self.open_listeners:
+            listener.wall_opened(x_pos, y_pos, wall)
+
+    # Junction graph returns the maze's junction graph, building it the first time it is asked for and keeping it up to date from then on
+    # Any special cells given, as (x, y) positions, are made vertices of the graph even if they are in the middle of a corridor
+    def junction_graph(self, special_cells=()):
+        if self.junctions is None:
+            self.junctions = JunctionGraph(self, special_cells)
+            self.wall_listeners.append(self.junctions)
+        else:
+            for x_pos, y_pos in special_cells:
+                self.junctions.add_special(x_pos, y_pos)
+        return self.junctions
+
+    # Path service returns the maze's path service, creating it the first time it is asked for
+    def path_service(self, capacity=8):
+        if self.paths is None:
+            self.paths = PathService(self, capacity)
+            self.wall_listeners.append(self.paths)
+            self.open_listeners.append(self.paths)
+        return self.paths
+
+    # Incremental planner returns a planner keeping a path to (x_goal, y_goal) up to date, starting from (x_start, y_start)
+    # The planner is kept while the goal stays the same, so asking for it again only moves its start. A new goal replaces it with a new planner
+    def incremental_planner(self, x_goal, y_goal, x_start, y_start):
+        goal = x_goal * self.height + y_goal
+        if self.replanner is not None and self.replanner.goal == goal:
+            self.replanner.move_start(x_start, y_start)
+            return self.replanner
+        if self.replanner is not None:
+            self.wall_listeners.remove(self.replanner)
+        self.replanner = IncrementalPlanner(self, x_goal, y_goal, x_start, y_start)
+        self.wall_listeners.append(self.replanner)
+        return self.replanner
+
+    # Distance field returns the maze's flood fill distance field to (x_goal, y_goal), filling it the first time it is asked for
+    # A field is kept for every goal that has been asked for, as distances from a cell to a goal are the same as from the goal to the cell
+    def distance_field(self, x_goal, y_goal):
+        goal = x_goal * self.height + y_goal
+        if goal not in self.fields:
+            self.fields[goal] = DistanceField(self, x_goal, y_goal)
+            self.wall_listeners.append(self.fields[goal])
+        return self.fields[goal]
+
+    # Assume perfect maze tells the maze that it has no loops, so that walls between cells already joined by a route are inferred to be present
+    # The cells already joined through walls known to be open are joined straight away, from then on they are joined as infer_walls works through the dirty cells
+    def assume_perfect_maze(self):
+        if self.components is not None:
+            return
+        self.components = OpenComponents(self)
+        for x_pos in range(self.width):
+            for y_pos in range(self.height):
+                self.components.join_open_walls(x_pos, y_pos)
+
+    # Relevant cells returns the cells that could be on a route from (x_start, y_start) to (x_end, y_end), kept up to date as walls are added
+    # A new start or end replaces the relevant cells with new ones
+    def relevant_cells(self, x_start, y_start, x_end, y_end):
+        start = x_start * self.height + y_start
+        end = x_end * self.height + y_end
+        if self.relevance is not None and (self.relevance.start, self.relevance.end) == (start, end):
+            return self.relevance
+        if self.relevance is not None:
+            self.wall_listeners.remove(self.relevance)
+        self.relevance = RelevantCells(self, x_start, y_start, x_end, y_end)
+        self.wall_listeners.append(self.relevance)
+        return self.relevance
+
+    # Count known wall adds a wall that has just become known to the count for the whole maze and the count for its region
+    def count_known_wall(self, x_pos, y_pos, wall):
+        self.known_walls += 1
+        region = self.wall_region(x_pos, y_pos, wall)
+        self.region_known_walls[region] = self.region_known_walls.get(region, 0) + 1
+
+    # Wall region returns the (x, y) region a wall is counted in
+    # Every wall belongs to the cell it is the north or east wall of, except along the bottom and left edges where there is no such cell
+    def wall_region(self, x_pos, y_pos, wall):
+        if wall == Walls.South and y_pos > 0: y_pos -= 1
+        if wall == Walls.West and x_pos > 0: x_pos -= 1
+        return x_pos // self.region_size, y_pos // self.region_size
+
+    # Region walls returns how many walls are counted in the given region, worked out from its size rather than stored
+    def region_walls(self, x_region, y_region):
+        x_start = x_region * self.region_size
+        y_start = y_region * self.region_size
+        width = max(0, min(self.width, x_start + self.region_size) - x_start)
+        height = max(0, min(self.height, y_start + self.region_size) - y_start)
+        # Each cell owns its north and east walls, and the cells along the bottom and left edges of the maze also own their south and west walls
+        walls = 2 * width * height
+        if y_start == 0: walls += width
+        if x_start == 0: walls += height
+        return walls
+
+    # This method returns how many walls in the whole maze are still unknown
+    def unknown_walls(self):
+        return self.total_walls - self.known_walls
+
+    # This method returns how many walls in the given region are still unknown
+    def region_unknown_walls(self, x_region, y_region):
+        return self.region_walls(x_region, y_region) - self.region_known_walls.get((x_region, y_region), 0)
+
+    # Mark wall dirty queues the cell at (x_pos, y_pos) and the neighbouring cell on the other side of the given wall, if they are not queued already
+    # These are the only two cells whose edges can be inferred differently after the wall changes
+    def mark_wall_dirty(self, x_pos, y_pos, wall):
+        for x_cell, y_cell in ((x_pos, y_pos), (x_pos + wall_x_offsets[wall], y_pos + wall_y_offsets[wall])):
+            if 0 <= x_cell < self.width and 0 <= y_cell < self.height and (x_cell, y_cell) not in self.dirty_set:
+                self.dirty_set.add((x_cell, y_cell))
+                self.dirty_cells.append((x_cell, y_cell))
+
     # This method can check a given cell for having three present walls, and if this is the case
     # For extra speed we can assume that s a cell must be accessible from at least one side
     # therefore if there is three walls present, we can infer that the last edge is going to not be present
@@ -374,57 +652,129 @@ class Maze:
         # Ths amount of cells that have been changed is returned so the function can be run again using the new data it has just generated
         return amount_changed
 
+    # Infer walls extrapolates edges from only the cells that have been queued as dirty, rather than sweeping the whole maze until nothing changes
+    # Only the cells around walls that have changed are checked, so this costs the same however big the maze is
+    # Forcing a wall queues the cells either side of it, so inference carries on spreading until the queue is empty, the same result as repeated sweeps
+    def infer_walls(self):
+        amount_changed = 0
+        while self.dirty_cells:
+            position = self.dirty_cells.pop()
+            self.dirty_set.discard(position)
+            amount_changed += self.extrapolate_edges(self.cells[position[0]][position[1]])
+            # Every wall that changes queues the cells either side of it, so a wall that has become open is always joined here
+            if self.components is not None:
+                amount_changed += self.components.join_open_walls(position[0], position[1])
+        return amount_changed
+
     # This method will return if a value for the state of every wall in a cell is known
+    # Every cell is known exactly when every wall is known, so this only needs the count of unknown walls
     def all_cells_known(self):
-        for cell_array in self.cells:
-            for cell in cell_array:
-                # This method uses the cells fully_known method to check if that cell is fully known
-                cell_fully_known = cell.fully_known()
-                # When the cell is not known, the function returns as it does not need to check any more cells
-                if not cell_fully_known:
-                    return False
-        return True
+        return self.unknown_walls() == 0
+
+    # Wall present returns if the given wall of the cell at (x_pos, y_pos) is present, regardless of if that wall's state is actually known
+    # It reads the nodes at either end of the wall straight from the nodes list, which is quicker than going through the cell when searching large mazes
+    # The two nodes of a wall are always linked to each other together, so only one of them needs checking
+    def wall_present(self, x_pos, y_pos, wall):
+        if wall == 0: return self.nodes[x_pos][y_pos + 1].east_node is not None
+        if wall == 1: return self.nodes[x_pos + 1][y_pos].north_node is not None
+        if wall == 2: return self.nodes[x_pos][y_pos].east_node is not None
+        return self.nodes[x_pos][y_pos].north_node is not None
+
+    # Wall blocked returns if the given wall of the cell at (x_pos, y_pos) is present or not yet known, so that only walls known to be open can be driven through
+    def wall_blocked(self, x_pos, y_pos, wall):
+        if wall == 0: return not self.nodes[x_pos][y_pos + 1].east_known or self.nodes[x_pos][y_pos + 1].east_node is not None
+        if wall == 1: return not self.nodes[x_pos + 1][y_pos].north_known or self.nodes[x_pos + 1][y_pos].north_node is not None
+        if wall == 2: return not self.nodes[x_pos][y_pos].east_known or self.nodes[x_pos][y_pos].east_node is not None
+        return not self.nodes[x_pos][y_pos].north_known or self.nodes[x_pos][y_pos].north_node is not None
+
+    # Wall known returns if the state of the given wall of the cell at (x_pos, y_pos) is known
+    # A wall is only ever present once it is known, so it is not known exactly when it is blocked without being present
+    def wall_known(self, x_pos, y_pos, wall):
+        return not self.wall_blocked(x_pos, y_pos, wall) or self.wall_present(x_pos, y_pos, wall)
 
     # This pathfinding method uses a breath first algorithm to pathfind from the start position (x_start, y_start) in the parameters
     # to the end position (x_end, y_end) specified in the parameters
-    def pathfind_breath_first(self, x_start, y_start, x_end, y_end):
-        stack = []
-        visited_cells = {}
-
-        start_cell = self.cells[x_start][y_start]
-        end_cell = self.cells[x_end][y_end]
-
-        stack.append(start_cell)
-        visited_cells[start_cell] = start_cell
-
-        while end_cell not in visited_cells:
-            current_cell = stack.pop(0)
-
-            if current_cell.north_cell is not None and current_cell.north_cell not in visited_cells and not current_cell.check_wall(Walls.North):
-                stack.append(current_cell.north_cell)
-                visited_cells[current_cell.north_cell] = current_cell
-
-            if current_cell.east_cell is not None and current_cell.east_cell not in visited_cells and not current_cell.check_wall(Walls.East):
-                stack.append(current_cell.east_cell)
-                visited_cells[current_cell.east_cell] = current_cell
-
-            if current_cell.south_cell is not None and current_cell.south_cell not in visited_cells and not current_cell.check_wall(Walls.South):
-                stack.append(current_cell.south_cell)
-                visited_cells[current_cell.south_cell] = current_cell
-
-            if current_cell.west_cell is not None and current_cell.west_cell not in visited_cells and not current_cell.check_wall(Walls.West):
-                stack.append(current_cell.west_cell)
-                visited_cells[current_cell.west_cell] = current_cell
-
-        tracing_cell = end_cell
-        path_points = []
-        while visited_cells[tracing_cell] is not tracing_cell:
-            tracing_cell = visited_cells[tracing_cell]
-            path_points.append((tracing_cell.x_position, tracing_cell.y_position))
-        path_points.reverse()
-        path_points.append((x_end, y_end))
-
-        return path_points
+    # The path is returned as a list of (x, y) positions including both ends, or None if there is no path between them
+    # Bidirectional searches from both ends at once, which looks at far fewer cells in a large open maze but may pick a different path of the same length
+    # Known only only goes through walls that are known not to be present, rather than treating walls that are not known as not present
+    def pathfind_breath_first(self, x_start, y_start, x_end, y_end, bidirectional=False, known_only=False):
+        if self.search is None:
+            self.search = BreadthFirstSearch(self)
+        return self.search.find_path(x_start, y_start, x_end, y_end, bidirectional, known_only)
+
+    # This pathfinding method finds the route from (x_start, y_start) to (x_end, y_end) that takes the least time to drive, rather than the one through the fewest cells
+    # It searches over the robot's state as well as its cell: the wall it is facing, and if it last drove forward, in reverse or has not driven yet
+    # The robot drives through walls the same way as drive_through_wall, turning to face the wall or to face away from it and reversing, whichever the motion costs say is quicker
+    # The times taken are given by the robot's motion costs: driving a cell forward or in reverse, turning, the extra time taken to start a new drive
+    # rather than carrying on with the one before it, and the extra time taken to change between driving forward and in reverse
+    # The path is returned as a list of (x, y) positions including both ends, or None if there is no path between them
+    # When x_end and y_end are None the path ends at whichever cell with a wall that is not known can be reached and scanned soonest,
+    # with scanning a cell estimated as a quarter turn and a reading for each wall that is not known other than the one the robot arrives facing
+    # Is target can be given to choose which of those cells the path may end at instead, as a function of a cell's (x, y) position
+    # When known only is True the path only goes through walls that are known not to be present, so it is safe to drive without checking them first
+    def pathfind_fastest(self, x_start, y_start, x_end, y_end, start_heading, costs, known_only=False, is_target=None):
+        # A state is stored as a single integer made from the cell index, the facing wall and the drive direction, where direction 2 means not driven yet
+        start = ((x_start * self.height + y_start) * 4 + int(start_heading)) * 3 + 2
+        end = None if x_end is None else x_end * self.height + y_end
+        wall_blocked = self.wall_blocked if known_only else self.wall_present
+        times = {start: 0.0}
+        parents = {start: start}
+        # The queue is ordered by the time so far plus the time it would take to drive straight to the end ignoring walls and turns, which is never more than the real time
+        # With no end given there is nothing to estimate from, so the queue is ordered by the time so far alone
+        cell_time = min(costs.drive_time, costs.reverse_time)
+        queue = [(0.0 if end is None else cell_time * (abs(x_end - x_start) + abs(y_end - y_start)), 0.0, start)]
+
+        while queue:
+            estimate, time, state = heapq.heappop(queue)
+            # A finished state is queued as a negative number, so that it comes out of the queue in order of the time taken to reach and scan its cell
+            finished = state < 0
+            if finished:
+                state = -state - 1
+            elif time > times[state]:
+                continue
+            index, direction = divmod(state, 3)
+            index, heading = divmod(index, 4)
+            x_pos, y_pos = divmod(index, self.height)
+            if end is None and not finished and not self.cells[x_pos][y_pos].fully_known() and (is_target is None or is_target(x_pos, y_pos)):
+                scan_time = 0.0
+                for wall in range(4):
+                    if wall != heading and not self.cells[x_pos][y_pos].wall_known(wall):
+                        scan_time += costs.turn_time + costs.scan_time
+                heapq.heappush(queue, (time + scan_time, time + scan_time, -state - 1))
+                continue
+            if index == end or finished:
+                path = []
+                while parents[state] != state:
+                    path.append(divmod(state // 12, self.height))
+                    state = parents[state]
+                path.append((x_start, y_start))
+                path.reverse()
+                return path
+
+            for wall in range(4):
+                x_next = x_pos + wall_x_offsets[wall]
+                y_next = y_pos + wall_y_offsets[wall]
+                if not (0 <= x_next < self.width and 0 <= y_next < self.height) or wall_blocked(x_pos, y_pos, wall):
+                    continue
+
+                # The robot either faces the wall and drives forward, or faces away from it and reverses, turning first if it needs to
+                move_time, reverse = costs.through_wall(90 * heading, wall)
+                next_heading = (wall + 2) % 4 if reverse else wall
+                next_direction = 1 if reverse else 0
+                # Only a drive in the same direction with no turn before it carries on from the last drive, anything else starts a new one
+                if next_heading != heading or next_direction != direction:
+                    move_time += costs.drive_start_time
+                    if next_heading == heading and direction != 2:
+                        move_time += costs.direction_change_time
+
+                next_time = time + move_time
+                next_state = ((x_next * self.height + y_next) * 4 + next_heading) * 3 + next_direction
+                if next_state not in times or next_time < times[next_state]:
+                    times[next_state] = next_time
+                    parents[next_state] = state
+                    remaining = 0.0 if end is None else cell_time * (abs(x_end - x_next) + abs(y_end - y_next))
+                    heapq.heappush(queue, (next_time + remaining, next_time, next_state))
+        return None
 
     # Print plain will print the mazes current interpretation of the maze as it has been traversed. It prints from top to bottom using the characters returned by the cells and nodes themselves
     def print_plain(self):
@@ -499,6 +849,1352 @@ class Maze:
             brain.print(self.nodes[self.width][y_pos].get_unicode_char())
 
 
+# The breadth first search finds shortest paths through a maze, treating walls that are not known as not present
+# Cells are referred to by an integer index of x_pos * height + y_pos, and all of the lists it uses are created once and reused for every search
+# Rather than clearing the lists before each search, every search has its own generation number and a cell only counts as reached if it is marked with the current one
+class BreadthFirstSearch:
+    def __init__(self, maze):
+        self.maze = maze
+        self.width = maze.width
+        self.height = maze.height
+        size = maze.width * maze.height
+
+        # Each direction of the search has a queue, and for every cell the generation it was reached in, the cell it was reached from and its distance
+        # Every cell is added to a queue at most once per search, so the queues never need to wrap around
+        self.queue = [0] * size
+        self.marks = [0] * size
+        self.parents = [0] * size
+        self.distances = [0] * size
+        self.reverse_queue = [0] * size
+        self.reverse_marks = [0] * size
+        self.reverse_parents = [0] * size
+        self.reverse_distances = [0] * size
+        self.generation = 0
+        self.wall_blocked = maze.wall_present
+
+    # Find path returns the shortest path from (x_start, y_start) to (x_end, y_end) as a list of (x, y) positions, or None if the end can not be reached
+    # When known only is True walls that are not known are treated as present instead
+    def find_path(self, x_start, y_start, x_end, y_end, bidirectional=False, known_only=False):
+        for x_pos, y_pos in ((x_start, y_start), (x_end, y_end)):
+            if not (0 <= x_pos < self.width and 0 <= y_pos < self.height):
+                raise IndexError('path position (%d, %d) is outside of the maze' % (x_pos, y_pos))
+        self.generation += 1
+        # The searches read which walls block them through this, rather than being passed it, so the method can be looked up once per search
+        self.wall_blocked = self.maze.wall_blocked if known_only else self.maze.wall_present
+        start = x_start * self.height + y_start
+        end = x_end * self.height + y_end
+        if bidirectional:
+            return self.search_both_ways(start, end)
+        return self.search_forward(start, end)
+
+    # Search forward is a plain breadth first search from the start, stopping as soon as the end has been reached
+    # The neighbours are reached in the order north, east, south, west, so it always finds the same path as the original search did
+    def search_forward(self, start, end):
+        generation = self.generation
+        width = self.width
+        height = self.height
+        queue = self.queue
+        marks = self.marks
+        parents = self.parents
+        wall_blocked = self.wall_blocked
+
+        queue[0] = start
+        marks[start] = generation
+        parents[start] = start
+        head = 0
+        tail = 1
+        # The four directions are written out in full rather than looping over them, as this loop runs once for every cell in the maze
+        while head < tail and marks[end] != generation:
+            index = queue[head]
+            head += 1
+            x_pos, y_pos = divmod(index, height)
+            if y_pos + 1 < height:
+                neighbour = index + 1
+                if marks[neighbour] != generation and not wall_blocked(x_pos, y_pos, 0):
+                    marks[neighbour] = generation
+                    parents[neighbour] = index
+                    queue[tail] = neighbour
+                    tail += 1
+            if x_pos + 1 < width:
+                neighbour = index + height
+                if marks[neighbour] != generation and not wall_blocked(x_pos, y_pos, 1):
+                    marks[neighbour] = generation
+                    parents[neighbour] = index
+                    queue[tail] = neighbour
+                    tail += 1
+            if y_pos > 0:
+                neighbour = index - 1
+                if marks[neighbour] != generation and not wall_blocked(x_pos, y_pos, 2):
+                    marks[neighbour] = generation
+                    parents[neighbour] = index
+                    queue[tail] = neighbour
+                    tail += 1
+            if x_pos > 0:
+                neighbour = index - height
+                if marks[neighbour] != generation and not wall_blocked(x_pos, y_pos, 3):
+                    marks[neighbour] = generation
+                    parents[neighbour] = index
+                    queue[tail] = neighbour
+                    tail += 1
+
+        if marks[end] != generation:
+            return None
+        path = self.trace(end, start, parents)
+        path.reverse()
+        return path
+
+    # Search both ways grows a search from each end a whole layer at a time, always growing whichever has the smaller layer waiting
+    # Once a layer reaches a cell the other search has reached, the shortest of the paths joining up in that layer is the shortest path overall
+    def search_both_ways(self, start, end):
+        generation = self.generation
+        if start == end:
+            return [divmod(start, self.height)]
+
+        for queue, marks, parents, distances, cell in ((self.queue, self.marks, self.parents, self.distances, start),
+                                                       (self.reverse_queue, self.reverse_marks, self.reverse_parents, self.reverse_distances, end)):
+            queue[0] = cell
+            marks[cell] = generation
+            parents[cell] = cell
+            distances[cell] = 0
+        forward_head = reverse_head = 0
+        forward_tail = reverse_tail = 1
+
+        meeting = None
+        while meeting is None and forward_head < forward_tail and reverse_head < reverse_tail:
+            if forward_tail - forward_head <= reverse_tail - reverse_head:
+                forward_head, forward_tail, meeting = self.expand_layer(forward_head, forward_tail, self.queue, self.marks, self.parents, self.distances,
+                                                                        self.reverse_marks, self.reverse_distances)
+            else:
+                reverse_head, reverse_tail, meeting = self.expand_layer(reverse_head, reverse_tail, self.reverse_queue, self.reverse_marks, self.reverse_parents,
+                                                                        self.reverse_distances, self.marks, self.distances)
+                # The meeting is always given as the forward cell followed by the reverse cell
+                if meeting is not None:
+                    meeting = (meeting[1], meeting[0])
+
+        if meeting is None:
+            return None
+        path = self.trace(meeting[0], start, self.parents)
+        path.reverse()
+        path += self.trace(meeting[1], end, self.reverse_parents)
+        return path
+
+    # Expand layer reaches the neighbours of every cell in the queue from head to tail, adding them to the end of the queue
+    # It returns the new head and tail of the queue, and the (cell, neighbour) pair of the shortest path to a cell the other search has reached, if any
+    def expand_layer(self, head, tail, queue, marks, parents, distances, other_marks, other_distances):
+        generation = self.generation
+        width = self.width
+        height = self.height
+        wall_blocked = self.wall_blocked
+        meeting = None
+        best_length = 0
+
+        layer_end = tail
+        # The four directions are written out in full, the same as in search_forward
+        while head < layer_end:
+            index = queue[head]
+            head += 1
+            x_pos, y_pos = divmod(index, height)
+            if y_pos + 1 < height and not wall_blocked(x_pos, y_pos, 0):
+                neighbour = index + 1
+                if other_marks[neighbour] == generation:
+                    length = distances[index] + 1 + other_distances[neighbour]
+                    if meeting is None or length < best_length:
+                        meeting = (index, neighbour)
+                        best_length = length
+                if marks[neighbour] != generation:
+                    marks[neighbour] = generation
+                    parents[neighbour] = index
+                    distances[neighbour] = distances[index] + 1
+                    queue[tail] = neighbour
+                    tail += 1
+            if x_pos + 1 < width and not wall_blocked(x_pos, y_pos, 1):
+                neighbour = index + height
+                if other_marks[neighbour] == generation:
+                    length = distances[index] + 1 + other_distances[neighbour]
+                    if meeting is None or length < best_length:
+                        meeting = (index, neighbour)
+                        best_length = length
+                if marks[neighbour] != generation:
+                    marks[neighbour] = generation
+                    parents[neighbour] = index
+                    distances[neighbour] = distances[index] + 1
+                    queue[tail] = neighbour
+                    tail += 1
+            if y_pos > 0 and not wall_blocked(x_pos, y_pos, 2):
+                neighbour = index - 1
+                if other_marks[neighbour] == generation:
+                    length = distances[index] + 1 + other_distances[neighbour]
+                    if meeting is None or length < best_length:
+                        meeting = (index, neighbour)
+                        best_length = length
+                if marks[neighbour] != generation:
+                    marks[neighbour] = generation
+                    parents[neighbour] = index
+                    distances[neighbour] = distances[index] + 1
+                    queue[tail] = neighbour
+                    tail += 1
+            if x_pos > 0 and not wall_blocked(x_pos, y_pos, 3):
+                neighbour = index - height
+                if other_marks[neighbour] == generation:
+                    length = distances[index] + 1 + other_distances[neighbour]
+                    if meeting is None or length < best_length:
+                        meeting = (index, neighbour)
+                        best_length = length
+                if marks[neighbour] != generation:
+                    marks[neighbour] = generation
+                    parents[neighbour] = index
+                    distances[neighbour] = distances[index] + 1
+                    queue[tail] = neighbour
+                    tail += 1
+        return head, tail, meeting
+
+    # Search all runs a breadth first search from the start over the whole maze, without stopping early, filling in the given distance and parent lists
+    # Cells that can not be reached are given a distance of -1. Neighbours are reached in the same order as search_forward, so the parents are the same as it would give
+    # It returns how many cells were reached, which are left in the order they were reached at the front of the queue. When known only is True walls that are not known are treated as present
+    def search_all(self, start, distances, parents, known_only=False):
+        width = self.width
+        height = self.height
+        queue = self.queue
+        wall_present = self.maze.wall_blocked if known_only else self.maze.wall_present
+
+        queue[0] = start
+        distances[start] = 0
+        parents[start] = start
+        head = 0
+        tail = 1
+        # The four directions are written out in full, the same as in search_forward
+        while head < tail:
+            index = queue[head]
+            head += 1
+            x_pos, y_pos = divmod(index, height)
+            if y_pos + 1 < height:
+                neighbour = index + 1
+                if distances[neighbour] < 0 and not wall_present(x_pos, y_pos, 0):
+                    distances[neighbour] = distances[index] + 1
+                    parents[neighbour] = index
+                    queue[tail] = neighbour
+                    tail += 1
+            if x_pos + 1 < width:
+                neighbour = index + height
+                if distances[neighbour] < 0 and not wall_present(x_pos, y_pos, 1):
+                    distances[neighbour] = distances[index] + 1
+                    parents[neighbour] = index
+                    queue[tail] = neighbour
+                    tail += 1
+            if y_pos > 0:
+                neighbour = index - 1
+                if distances[neighbour] < 0 and not wall_present(x_pos, y_pos, 2):
+                    distances[neighbour] = distances[index] + 1
+                    parents[neighbour] = index
+                    queue[tail] = neighbour
+                    tail += 1
+            if x_pos > 0:
+                neighbour = index - height
+                if distances[neighbour] < 0 and not wall_present(x_pos, y_pos, 3):
+                    distances[neighbour] = distances[index] + 1
+                    parents[neighbour] = index
+                    queue[tail] = neighbour
+                    tail += 1
+        return tail
+
+    # Trace follows the parents back from the given cell to the root the search started from, returning the positions of the cells passed through including both
+    def trace(self, index, root, parents):
+        path = []
+        while index != root:
+            path.append(divmod(index, self.height))
+            index = parents[index]
+        path.append(divmod(root, self.height))
+        return path
+
+
+# The path service answers many path queries on the same maze, keeping the distances, parents and search order found by a full breadth first search from each start it has been asked about
+# Tables treating walls that are not known as open and tables only going through walls known to be open are kept separately, as they give different paths
+# Only the most recently used capacity tables are kept, so the memory used stays the same however many different starts are asked about
+# The service listens for walls being added and opened, and only throws away the tables a wall could change. Adding a wall can only change a table if it cuts one of its parent links,
+# and opening a wall can only change a table through known walls if the cells either side of it are not the same distance from the start. Every other table gives the same paths a new search would
+class PathService:
+    def __init__(self, maze, capacity=8):
+        self.maze = maze
+        self.height = maze.height
+        self.capacity = capacity
+        # Tables maps a (start index, known only) pair to its (distances, parents, order) lists, in order from least to most recently used
+        self.tables = {}
+        self.searches = 0
+
+    # Table returns the distance, parent and order lists for the given start, searching the maze for them if they are not kept already
+    def table(self, start, known_only):
+        key = (start, known_only)
+        table = self.tables.pop(key, None)
+        if table is None:
+            size = self.maze.width * self.height
+            distances = [-1] * size
+            parents = [0] * size
+            if self.maze.search is None:
+                self.maze.search = BreadthFirstSearch(self.maze)
+            reached = self.maze.search.search_all(start, distances, parents, known_only)
+            table = (distances, parents, self.maze.search.queue[:reached])
+            self.searches += 1
+            # The least recently used table is the first one in the dictionary, and is dropped once there are too many
+            if len(self.tables) >= self.capacity:
+                del self.tables[next(iter(self.tables))]
+        self.tables[key] = table
+        return table
+
+    # Distance returns how many cells apart (x_start, y_start) and (x_end, y_end) are along the shortest path between them, or None if there is no path
+    def distance(self, x_start, y_start, x_end, y_end, known_only=False):
+        start = x_start * self.height + y_start
+        end = x_end * self.height + y_end
+        # Distances are the same in both directions, so a table already kept for the end answers the query as well as one for the start would
+        if (end, known_only) in self.tables and (start, known_only) not in self.tables:
+            start, end = end, start
+        distance = self.table(start, known_only)[0][end]
+        return None if distance < 0 else distance
+
+    # Find path returns the shortest path from (x_start, y_start) to (x_end, y_end) as a list of (x, y) positions, or None if there is no path
+    # The start's own table is always used, so the path is the same one pathfind_breath_first would find
+    def find_path(self, x_start, y_start, x_end, y_end, known_only=False):
+        start = x_start * self.height + y_start
+        end = x_end * self.height + y_end
+        distances, parents, order = self.table(start, known_only)
+        if distances[end] < 0:
+            return None
+        path = self.maze.search.trace(end, start, parents)
+        path.reverse()
+        return path
+
+    # Nearest path returns the shortest path from (x_start, y_start) to the first cell the search reached for which is_target(x, y) is True,
+    # which is one of the nearest such cells, as a list of (x, y) positions including both ends, or None if no such cell can be reached
+    def nearest_path(self, x_start, y_start, is_target, known_only=False):
+        start = x_start * self.height + y_start
+        distances, parents, order = self.table(start, known_only)
+        for index in order:
+            if is_target(index // self.height, index % self.height):
+                path = self.maze.search.trace(index, start, parents)
+                path.reverse()
+                return path
+        return None
+
+    # Wall added is called by the maze when the given wall of the cell at (x_pos, y_pos) becomes present
+    # Any table where one of the two cells either side of the wall was reached from the other is thrown away
+    def wall_added(self, x_pos, y_pos, wall):
+        x_next = x_pos + wall_x_offsets[wall]
+        y_next = y_pos + wall_y_offsets[wall]
+        if not (0 <= x_next < self.maze.width and 0 <= y_next < self.height):
+            return
+        index = x_pos * self.height + y_pos
+        neighbour = x_next * self.height + y_next
+        for key in list(self.tables):
+            distances, parents, order = self.tables[key]
+            if distances[index] >= 0 and (parents[index] == neighbour or parents[neighbour] == index):
+                del self.tables[key]
+
+    # Wall opened is called by the maze when the given wall of the cell at (x_pos, y_pos) becomes known to be open
+    # Tables treating unknown walls as open already went through it. A table through known walls is thrown away unless both cells are the same distance from its start,
+    # counting two cells that can not be reached as the same, as only then would a new search never go through the wall
+    def wall_opened(self, x_pos, y_pos, wall):
+        x_next = x_pos + wall_x_offsets[wall]
+        y_next = y_pos + wall_y_offsets[wall]
+        if not (0 <= x_next < self.maze.width and 0 <= y_next < self.height):
+            return
+        index = x_pos * self.height + y_pos
+        neighbour = x_next * self.height + y_next
+        for key in list(self.tables):
+            distances = self.tables[key][0]
+            if key[1] and distances[index] != distances[neighbour]:
+                del self.tables[key]
+
+
+# The incremental planner keeps a shortest path from a start to a goal up to date as walls are found, using the D* Lite algorithm
+# It searches backwards from the goal, keeping for every cell it has looked at its distance to the goal (g) and the distance its neighbours say it should have (rhs)
+# When a wall is added only the two cells either side of it are changed, and the search carries on from them, only correcting the distances the wall actually changed
+# The start can move as the robot drives, the key modifier keeps the queue's ordering correct without having to rebuild it
+# As with the breadth first search, walls that are not known are treated as not present
+class IncrementalPlanner:
+    infinity = float('inf')
+
+    def __init__(self, maze, x_goal, y_goal, x_start, y_start):
+        self.maze = maze
+        self.width = maze.width
+        self.height = maze.height
+        self.goal = x_goal * maze.height + y_goal
+        self.start = x_start * maze.height + y_start
+        self.key_modifier = 0
+
+        # Cells not in these dictionaries have a g and rhs of infinity
+        self.g = {}
+        self.rhs = {self.goal: 0}
+        # The queue holds (key, cell) entries, and keys the current key of every queued cell. Entries whose key no longer matches are skipped over
+        self.queue = []
+        self.keys = {}
+        self.push(self.goal)
+        self.expanded = 0
+
+    # Heuristic is the number of cells between two cells ignoring walls, which is never more than the real distance
+    def heuristic(self, index, other):
+        x_pos, y_pos = divmod(index, self.height)
+        x_other, y_other = divmod(other, self.height)
+        return abs(x_pos - x_other) + abs(y_pos - y_other)
+
+    def calculate_key(self, index):
+        smallest = min(self.g.get(index, self.infinity), self.rhs.get(index, self.infinity))
+        return smallest + self.heuristic(self.start, index) + self.key_modifier, smallest
+
+    # Push queues the cell with its current key, replacing any entry already queued for it
+    def push(self, index):
+        key = self.calculate_key(index)
+        self.keys[index] = key
+        heapq.heappush(self.queue, (key, index))
+
+    # Top removes any out of date entries from the front of the queue and returns the first real one, or None when the queue is empty
+    def top(self):
+        while self.queue:
+            key, index = self.queue[0]
+            if self.keys.get(index) == key:
+                return self.queue[0]
+            heapq.heappop(self.queue)
+        return None
+
+    # Neighbours gives the index of each cell that can be driven to from the cell at the given index, going through a wall that is not present
+    def neighbours(self, index):
+        x_pos, y_pos = divmod(index, self.height)
+        for wall in range(4):
+            x_next = x_pos + wall_x_offsets[wall]
+            y_next = y_pos + wall_y_offsets[wall]
+            if 0 <= x_next < self.width and 0 <= y_next < self.height and not self.maze.wall_present(x_pos, y_pos, wall):
+                yield x_next * self.height + y_next
+
+    # Update cell works out the rhs of a cell again from its neighbours, and queues it if its g no longer agrees
+    def update_cell(self, index):
+        if index != self.goal:
+            best = self.infinity
+            for neighbour in self.neighbours(index):
+                best = min(best, 1 + self.g.get(neighbour, self.infinity))
+            self.rhs[index] = best
+        if self.g.get(index, self.infinity) != self.rhs.get(index, self.infinity):
+            self.push(index)
+        else:
+            self.keys.pop(index, None)
+
+    # Compute shortest path works through the queue until the start's distance is correct, only looking at the cells that need correcting
+    def compute_shortest_path(self):
+        while True:
+            entry = self.top()
+            start_g = self.g.get(self.start, self.infinity)
+            start_rhs = self.rhs.get(self.start, self.infinity)
+            if entry is None or (entry[0] >= self.calculate_key(self.start) and start_g == start_rhs):
+                return
+            old_key, index = heapq.heappop(self.queue)
+            del self.keys[index]
+            self.expanded += 1
+            new_key = self.calculate_key(index)
+            g = self.g.get(index, self.infinity)
+            rhs = self.rhs.get(index, self.infinity)
+            if old_key < new_key:
+                # The key went up since the cell was queued, so it is queued again in its right place
+                self.keys[index] = new_key
+                heapq.heappush(self.queue, (new_key, index))
+            elif g > rhs:
+                # The cell's distance went down, so its neighbours may now be closer through it
+                self.g[index] = rhs
+                for neighbour in self.neighbours(index):
+                    self.update_cell(neighbour)
+            else:
+                # The cell's distance went up, so it and its neighbours all need working out again
+                self.g[index] = self.infinity
+                self.update_cell(index)
+                for neighbour in self.neighbours(index):
+                    self.update_cell(neighbour)
+
+    # Move start tells the planner the robot has moved to (x_pos, y_pos)
+    # The key modifier grows by the most the heuristic of any cell could have dropped by in the move, so every key already queued stays a lower bound
+    def move_start(self, x_pos, y_pos):
+        start = x_pos * self.height + y_pos
+        if start != self.start:
+            self.key_modifier += self.heuristic(self.start, start)
+            self.start = start
+
+    # Wall added is called by the maze when the given wall of the cell at (x_pos, y_pos) becomes present
+    # Only the cells either side of the wall are updated straight away, the rest of the repair is done the next time the path is asked for
+    def wall_added(self, x_pos, y_pos, wall):
+        x_next = x_pos + wall_x_offsets[wall]
+        y_next = y_pos + wall_y_offsets[wall]
+        if not (0 <= x_next < self.width and 0 <= y_next < self.height):
+            return
+        self.update_cell(x_pos * self.height + y_pos)
+        self.update_cell(x_next * self.height + y_next)
+
+    # Distance returns how many cells the start is from the goal, or None if the goal can not be reached
+    def distance(self):
+        self.compute_shortest_path()
+        distance = self.g.get(self.start, self.infinity)
+        return None if distance == self.infinity else distance
+
+    # Next cell returns the (x, y) position of the next cell to drive to on the way to the goal, or None if the goal can not be reached or the start is the goal
+    def next_cell(self):
+        if self.distance() is None or self.start == self.goal:
+            return None
+        best = None
+        for neighbour in self.neighbours(self.start):
+            if best is None or self.g.get(neighbour, self.infinity) < self.g.get(best, self.infinity):
+                best = neighbour
+        return divmod(best, self.height)
+
+    # Find path returns the path from the start to the goal as a list of (x, y) positions, or None if the goal can not be reached
+    def find_path(self):
+        if self.distance() is None:
+            return None
+        index = self.start
+        path = [divmod(index, self.height)]
+        while index != self.goal:
+            best = None
+            for neighbour in self.neighbours(index):
+                if best is None or self.g.get(neighbour, self.infinity) < self.g.get(best, self.infinity):
+                    best = neighbour
+            index = best
+            path.append(divmod(index, self.height))
+        return path
+
+
+# The distance field holds, for every cell, how many cells it is from the goal treating walls that are not known as not present, like a micromouse flood fill
+# As walls that are not known could only make a path shorter, these distances are never more than the real distance once the whole maze is known
+# Walls are only ever added, so distances only ever go up. When a wall is added only the cells that were relying on a path through it are worked out again
+class DistanceField:
+    def __init__(self, maze, x_goal, y_goal):
+        self.maze = maze
+        self.width = maze.width
+        self.height = maze.height
+        self.goal = x_goal * maze.height + y_goal
+
+        # Distances uses the same x_pos * height + y_pos index as the breadth first search, with -1 for cells that can not reach the goal
+        size = maze.width * maze.height
+        self.distances = [-1] * size
+        if maze.search is None:
+            maze.search = BreadthFirstSearch(maze)
+        maze.search.search_all(self.goal, self.distances, [0] * size)
+        self.refilled = 0
+
+    # Neighbours gives the index of each cell that can be driven to from the cell at the given index, going through a wall that is not present
+    def neighbours(self, index):
+        x_pos, y_pos = divmod(index, self.height)
+        for wall in range(4):
+            x_next = x_pos + wall_x_offsets[wall]
+            y_next = y_pos + wall_y_offsets[wall]
+            if 0 <= x_next < self.width and 0 <= y_next < self.height and not self.maze.wall_present(x_pos, y_pos, wall):
+                yield x_next * self.height + y_next
+
+    # A cell is supported if it is the goal, or has an open neighbour one cell closer to the goal than it is
+    def supported(self, index):
+        if index == self.goal:
+            return True
+        distance = self.distances[index] - 1
+        for neighbour in self.neighbours(index):
+            if self.distances[neighbour] == distance:
+                return True
+        return False
+
+    # Wall added is called by the maze when the given wall of the cell at (x_pos, y_pos) becomes present
+    def wall_added(self, x_pos, y_pos, wall):
+        x_next = x_pos + wall_x_offsets[wall]
+        y_next = y_pos + wall_y_offsets[wall]
+        if not (0 <= x_next < self.width and 0 <= y_next < self.height):
+            return
+        distances = self.distances
+        index = x_pos * self.height + y_pos
+        neighbour = x_next * self.height + y_next
+        # Only the cell further from the goal can have been relying on the other, and only if it has no other way of being as close
+        if distances[index] < 0 or distances[neighbour] < 0 or distances[index] == distances[neighbour]:
+            return
+        far = index if distances[index] > distances[neighbour] else neighbour
+        if self.supported(far):
+            return
+
+        # The cells that lost their support are cleared, along with any cell further out which was only supported by one of them
+        old_distances = {far: distances[far]}
+        distances[far] = -1
+        stack = [far]
+        while stack:
+            index = stack.pop()
+            for neighbour in self.neighbours(index):
+                if distances[neighbour] == old_distances[index] + 1 and not self.supported(neighbour):
+                    old_distances[neighbour] = distances[neighbour]
+                    distances[neighbour] = -1
+                    stack.append(neighbour)
+        self.refill(old_distances)
+
+    # Refill gives the cleared cells their new distances, spreading out from the cells around them whose distances are still correct
+    def refill(self, cleared):
+        distances = self.distances
+        queue = []
+        for index in cleared:
+            for neighbour in self.neighbours(index):
+                if distances[neighbour] >= 0:
+                    queue.append((distances[neighbour] + 1, index))
+        heapq.heapify(queue)
+        while queue:
+            distance, index = heapq.heappop(queue)
+            if distances[index] >= 0:
+                continue
+            distances[index] = distance
+            self.refilled += 1
+            for neighbour in self.neighbours(index):
+                if distances[neighbour] < 0 and neighbour in cleared:
+                    heapq.heappush(queue, (distance + 1, neighbour))
+
+    # Distance returns how many cells the cell at (x_pos, y_pos) is from the goal, or None if it can not reach the goal
+    def distance(self, x_pos, y_pos):
+        distance = self.distances[x_pos * self.height + y_pos]
+        return None if distance < 0 else distance
+
+    # Downhill wall returns the wall to drive through from the cell at (x_pos, y_pos) to get one cell closer to the goal, or None if there is none
+    # This only compares the distances of the cell's neighbours, so it can be used for every step without searching
+    def downhill_wall(self, x_pos, y_pos):
+        distance = self.distances[x_pos * self.height + y_pos]
+        if distance <= 0:
+            return None
+        for wall in Walls:
+            x_next = x_pos + wall_x_offsets[wall]
+            y_next = y_pos + wall_y_offsets[wall]
+            if 0 <= x_next < self.width and 0 <= y_next < self.height and not self.maze.wall_present(x_pos, y_pos, wall):
+                if self.distances[x_next * self.height + y_next] == distance - 1:
+                    return wall
+        return None
+
+    # Optimality gap returns how many cells longer a route of the given length from (x_pos, y_pos) to the goal could be than the shortest route,
+    # as the distance field is never more than the length of the shortest route. A gap of 0 means the route is certainly a shortest one
+    def optimality_gap(self, x_pos, y_pos, route_length):
+        return route_length - self.distances[x_pos * self.height + y_pos]
+
+
+# The junction graph is a compressed version of the maze for planning, in which only junctions, dead ends and special cells such as the start and end are vertices
+# Every other cell has exactly two open walls, so it is part of a corridor, and each corridor is stored as a single edge carrying its length and how many turns it has
+# As with the breadth first search, walls that are not known are treated as not present. Walls are only ever added to the maze, never removed,
+# so when a wall is added only the vertices at the ends of the corridors running through the two cells either side of it need their edges finding again
+class JunctionGraph:
+    def __init__(self, maze, special_cells=()):
+        self.maze = maze
+        self.width = maze.width
+        self.height = maze.height
+        # Cells are referred to by the same x_pos * height + y_pos index as the breadth first search
+        self.special = set(x_pos * maze.height + y_pos for x_pos, y_pos in special_cells)
+
+        # Edges maps each vertex to a dictionary of the corridors leaving it, keyed by the wall each one leaves through
+        # Each corridor is stored as (end vertex, wall it arrives at the end vertex through, length in cells, number of turns)
+        self.edges = {}
+        for index in range(self.width * self.height):
+            if self.is_vertex(index):
+                self.edges[index] = {}
+        for vertex in list(self.edges):
+            self.connect(vertex)
+
+    # Open walls returns the walls of the cell at the given index that lead to another cell and are not present
+    def open_walls(self, index):
+        x_pos, y_pos = divmod(index, self.height)
+        walls = []
+        for wall in range(4):
+            x_next = x_pos + wall_x_offsets[wall]
+            y_next = y_pos + wall_y_offsets[wall]
+            if 0 <= x_next < self.width and 0 <= y_next < self.height and not self.maze.wall_present(x_pos, y_pos, wall):
+                walls.append(wall)
+        return walls
+
+    # A cell is a vertex unless it is a corridor cell, with exactly two open walls and not a special cell
+    def is_vertex(self, index):
+        return index in self.special or len(self.open_walls(index)) != 2
+
+    # Walk follows the corridor leaving the cell at the given index through the given wall until it reaches a vertex or comes back around to where it started
+    # It returns the cell it stopped at, the wall it arrived through, the number of cells moved and the number of turns made
+    # When a list of cells is given, the (x, y) position of every cell moved into is added to it
+    def walk(self, index, wall, cells=None):
+        start = index
+        length = 0
+        turns = 0
+        while True:
+            x_pos, y_pos = divmod(index, self.height)
+            index = (x_pos + wall_x_offsets[wall]) * self.height + y_pos + wall_y_offsets[wall]
+            length += 1
+            if cells is not None:
+                cells.append(divmod(index, self.height))
+            arrived_through = (wall + 2) % 4
+            if index == start or self.is_vertex(index):
+                return index, arrived_through, length, turns
+            # A corridor cell has one other open wall, which is the way out of it
+            for next_wall in self.open_walls(index):
+                if next_wall != arrived_through:
+                    break
+            if next_wall != wall:
+                turns += 1
+            wall = next_wall
+
+    # Connect finds every corridor leaving the given vertex, replacing its edges and setting the matching edge of the vertex at the other end of each corridor
+    def connect(self, vertex):
+        self.edges[vertex] = {}
+        for wall in self.open_walls(vertex):
+            end, arrived_through, length, turns = self.walk(vertex, wall)
+            self.edges[vertex][wall] = (end, arrived_through, length, turns)
+            self.edges[end][arrived_through] = (vertex, wall, length, turns)
+
+    # Wall added is called by the maze when the given wall of the cell at (x_pos, y_pos) becomes present
+    # The cells either side of the wall, and the vertices at the ends of the corridors through them, are the only places whose edges can change
+    def wall_added(self, x_pos, y_pos, wall):
+        changed = [x_pos * self.height + y_pos]
+        x_next = x_pos + wall_x_offsets[wall]
+        y_next = y_pos + wall_y_offsets[wall]
+        if 0 <= x_next < self.width and 0 <= y_next < self.height:
+            changed.append(x_next * self.height + y_next)
+        self.update_around(changed)
+
+    # Add special makes the cell at (x_pos, y_pos) a vertex, splitting the corridor it was part of in two if it was not one already
+    def add_special(self, x_pos, y_pos):
+        index = x_pos * self.height + y_pos
+        if index not in self.special:
+            self.special.add(index)
+            self.update_around([index])
+
+    # Update around finds the edges again for the given cells and the vertices at the ends of the corridors running through them
+    def update_around(self, changed):
+        affected = set()
+        for index in changed:
+            if self.is_vertex(index):
+                affected.add(index)
+                continue
+            # A cell that is no longer a vertex loses its edges, the vertices either side of it will now be joined by a corridor through it instead
+            self.edges.pop(index, None)
+            for wall in self.open_walls(index):
+                end = self.walk(index, wall)[0]
+                if end != index:
+                    affected.add(end)
+        for vertex in affected:
+            self.edges.setdefault(vertex, {})
+        for vertex in affected:
+            self.connect(vertex)
+
+    # Find path returns the shortest path from (x_start, y_start) to (x_end, y_end) as a list of (x, y) positions, or None if the end can not be reached
+    # The search only visits the vertices of the graph, with each corridor only being walked through again to list its cells once the path is found
+    # The start and end are made special cells so they are vertices, which they stay from then on
+    def find_path(self, x_start, y_start, x_end, y_end):
+        self.add_special(x_start, y_start)
+        self.add_special(x_end, y_end)
+        start = x_start * self.height + y_start
+        end = x_end * self.height + y_end
+
+        lengths = {start: 0}
+        # Parents maps each vertex reached to the vertex it was reached from and the wall it left that vertex through
+        parents = {start: None}
+        queue = [(0, start)]
+        while queue:
+            length, vertex = heapq.heappop(queue)
+            if vertex == end:
+                break
+            if length > lengths[vertex]:
+                continue
+            for wall, edge in self.edges[vertex].items():
+                next_length = length + edge[2]
+                if edge[0] not in lengths or next_length < lengths[edge[0]]:
+                    lengths[edge[0]] = next_length
+                    parents[edge[0]] = (vertex, wall)
+                    heapq.heappush(queue, (next_length, edge[0]))
+        if end not in lengths:
+            return None
+
+        # The corridors are listed from the end back to the start, then walked through in order to list their cells
+        hops = []
+        vertex = end
+        while parents[vertex] is not None:
+            hops.append(parents[vertex])
+            vertex = parents[vertex][0]
+        path = [(x_start, y_start)]
+        for vertex, wall in reversed(hops):
+            self.walk(vertex, wall, path)
+        return path
+
+
+# Open components keeps track of which cells are joined to each other through walls known to be open, using a union find
+# In a perfect maze there is only one route between any two cells, so a wall that is not known between two cells that are already joined must be present
+class OpenComponents:
+    def __init__(self, maze):
+        self.maze = maze
+        size = maze.width * maze.height
+        # Each cell's parent leads towards the root cell of its component, and the root of a component is its own parent
+        self.parents = list(range(size))
+        # The members of each component are kept by its root, so that the smaller of two components being joined can be checked for walls into the larger
+        self.members = [[index] for index in range(size)]
+
+    # Find returns the root of the component the cell at the given index is in, pointing every cell on the way straight at the root
+    def find(self, index):
+        parents = self.parents
+        root = index
+        while parents[root] != root:
+            root = parents[root]
+        while parents[index] != root:
+            parents[index], index = root, parents[index]
+        return root
+
+    # Join open walls joins the cell at (x_pos, y_pos) to each of its neighbouring cells through a wall known to be open
+    # It returns how many walls were inferred to be present from the components that were joined
+    def join_open_walls(self, x_pos, y_pos):
+        maze = self.maze
+        amount_changed = 0
+        for wall in range(4):
+            x_next = x_pos + wall_x_offsets[wall]
+            y_next = y_pos + wall_y_offsets[wall]
+            if 0 <= x_next < maze.width and 0 <= y_next < maze.height and not maze.wall_blocked(x_pos, y_pos, wall):
+                amount_changed += self.join(x_pos * maze.height + y_pos, x_next * maze.height + y_next)
+        return amount_changed
+
+    # Join joins the components of the two cells at the given indices, and returns how many walls were inferred to be present by doing so
+    # Any wall that is not known between the two components would make a loop if it were open, so each of them is set to be present
+    def join(self, index, other):
+        maze = self.maze
+        height = maze.height
+        root = self.find(index)
+        other_root = self.find(other)
+        if root == other_root:
+            return 0
+        if len(self.members[root]) < len(self.members[other_root]):
+            root, other_root = other_root, root
+
+        # Only the cells of the smaller component are checked, which keeps the total work small however the components are joined
+        inferred = []
+        for member in self.members[other_root]:
+            x_pos, y_pos = divmod(member, height)
+            for wall in range(4):
+                x_next = x_pos + wall_x_offsets[wall]
+                y_next = y_pos + wall_y_offsets[wall]
+                if not (0 <= x_next < maze.width and 0 <= y_next < height):
+                    continue
+                if self.find(x_next * height + y_next) == root and not maze.wall_known(x_pos, y_pos, wall):
+                    inferred.append((x_pos, y_pos, Walls(wall)))
+
+        self.parents[other_root] = root
+        self.members[root] += self.members[other_root]
+        self.members[other_root] = None
+
+        # The walls are set once the components are joined, updating them queues their cells so infer_walls carries on from them
+        for x_pos, y_pos, wall in inferred:
+            maze.update_cell(x_pos, y_pos, wall, True)
+        return len(inferred)
+
+
+# Relevant cells works out which cells could be on a route from the start to the end, treating walls that are not known as open
+# A route never visits a cell twice, so a cell can only be on one if it is in one of the biconnected blocks the start and end are separated by
+# Every other cell is in a dead end branch or a loop hanging off the route at a single articulation cell, or can not be reached at all,
+# so the walls there can not change the shortest route. Walls are only ever added, which can only take cells away, so the cells are worked out
+# again only when they are next asked about after a wall has been added
+class RelevantCells:
+    def __init__(self, maze, x_start, y_start, x_end, y_end):
+        self.maze = maze
+        self.width = maze.width
+        self.height = maze.height
+        # Cells are referred to by the same x_pos * height + y_pos index as the breadth first search
+        self.start = x_start * maze.height + y_start
+        self.end = x_end * maze.height + y_end
+        self.relevant = None
+        self.stale = True
+
+    # Neighbours gives the index of each cell next to the cell at the given index through a wall that is not present
+    def neighbours(self, index):
+        x_pos, y_pos = divmod(index, self.height)
+        for wall in range(4):
+            x_next = x_pos + wall_x_offsets[wall]
+            y_next = y_pos + wall_y_offsets[wall]
+            if 0 <= x_next < self.width and 0 <= y_next < self.height and not self.maze.wall_present(x_pos, y_pos, wall):
+                yield x_next * self.height + y_next
+
+    # Wall added is called by the maze when a wall becomes present, which is only noted until the cells are next asked about
+    def wall_added(self, x_pos, y_pos, wall):
+        self.stale = True
+
+    # Refresh finds the blocks of the maze with a depth first search from the start, using the tarjan articulation point algorithm
+    # The search is done with its own stack rather than by recursion, as the platform's recursion limit is far smaller than a large maze
+    def refresh(self):
+        self.stale = False
+        size = self.width * self.height
+        # Order is when each cell was first reached, counting from 1 so that 0 means not reached, and low is the earliest cell reachable from below it
+        order = [0] * size
+        low = [0] * size
+        parents = [-1] * size
+        # Each cell other than the start belongs to the block holding the link from its parent to it
+        block_of = [-1] * size
+        blocks = []
+        stack = []
+
+        order[self.start] = low[self.start] = 1
+        reached = 1
+        work = [(self.start, self.neighbours(self.start))]
+        while work:
+            index, neighbours = work[-1]
+            for neighbour in neighbours:
+                if not order[neighbour]:
+                    reached += 1
+                    order[neighbour] = low[neighbour] = reached
+                    parents[neighbour] = index
+                    stack.append(neighbour)
+                    work.append((neighbour, self.neighbours(neighbour)))
+                    break
+                if neighbour != parents[index]:
+                    low[index] = min(low[index], order[neighbour])
+            else:
+                # Every neighbour has been searched, so the cell is finished and its low is passed up to its parent
+                work.pop()
+                parent = parents[index]
+                if parent < 0:
+                    continue
+                low[parent] = min(low[parent], low[index])
+                # Nothing below the cell reaches above its parent, so the parent separates them and the cells below make a block with it
+                if low[index] >= order[parent]:
+                    block = [parent]
+                    while True:
+                        member = stack.pop()
+                        block.append(member)
+                        block_of[member] = len(blocks)
+                        if member == index:
+                            break
+                    blocks.append(block)
+
+        # The blocks on the route are those holding the links followed back from the end to the start
+        self.relevant = bytearray(size)
+        if not order[self.end]:
+            return
+        self.relevant[self.start] = 1
+        index = self.end
+        added = set()
+        while index != self.start:
+            if block_of[index] not in added:
+                added.add(block_of[index])
+                for member in blocks[block_of[index]]:
+                    self.relevant[member] = 1
+            index = parents[index]
+
+    # Contains returns if the cell at (x_pos, y_pos) could be on a route from the start to the end
+    def contains(self, x_pos, y_pos):
+        if self.stale:
+            self.refresh()
+        return self.relevant[x_pos * self.height + y_pos] != 0
+
+    # Unknown walls at returns how many walls of the cell at (x_pos, y_pos) are not known and lead into another relevant cell
+    # Only these walls could change the shortest route, so a cell with none of them is not worth looking at
+    def unknown_walls_at(self, x_pos, y_pos):
+        if not self.contains(x_pos, y_pos):
+            return 0
+        unknown = 0
+        for wall in range(4):
+            x_next = x_pos + wall_x_offsets[wall]
+            y_next = y_pos + wall_y_offsets[wall]
+            if 0 <= x_next < self.width and 0 <= y_next < self.height and self.relevant[x_next * self.height + y_next]:
+                if not self.maze.wall_known(x_pos, y_pos, wall):
+                    unknown += 1
+        return unknown
+
+    # All walls known returns if every wall between two relevant cells is known, after which exploring can not change the shortest route
+    # Regions of the maze with no unknown walls are skipped whole. A wall a skipped cell shares with a cell in another region is counted in that region,
+    # so if it is not known it is still found from the cell on the other side
+    def all_walls_known(self):
+        if self.stale:
+            self.refresh()
+        size = self.maze.region_size
+        for x_region in range((self.width + size - 1) // size):
+            for y_region in range((self.height + size - 1) // size):
+                if not self.maze.region_unknown_walls(x_region, y_region):
+                    continue
+                for x_pos in range(x_region * size, min(self.width, (x_region + 1) * size)):
+                    for y_pos in range(y_region * size, min(self.height, (y_region + 1) * size)):
+                        if self.relevant[x_pos * self.height + y_pos] and self.unknown_walls_at(x_pos, y_pos):
+                            return False
+        return True
+
+    # Path to relevant returns the shortest path through walls known to be open from the cell at (x_pos, y_pos) to the nearest relevant cell,
+    # as a list of (x, y) positions including both ends, or None if there is no such path. It is answered from the maze's path service
+    def path_to_relevant(self, x_pos, y_pos):
+        if self.stale:
+            self.refresh()
+        return self.maze.path_service().nearest_path(x_pos, y_pos, self.contains, known_only=True)
+
+
+# The packed cell has the same methods as a cell, but rather than being linked to nodes it reads and writes the flat arrays of a packed maze
+# Packed cells are created when they are asked for and hold no state of their own, so the maze does not need to keep an object for every square
+class PackedCell:
+    # Slots stop every packed cell carrying a dictionary of its attributes
+    __slots__ = ('x_position', 'y_position', 'maze', 'index')
+
+    def __init__(self, x_pos, y_pos, maze):
+        self.x_position = x_pos
+        self.y_position = y_pos
+        self.maze = maze
+        # The index is the cell's position in the packed maze's arrays
+        self.index = maze.cell_index(x_pos, y_pos)
+
+    # Packed cells are created already set up, this method is kept so that they can be used anywhere a cell is
+    def initialize_cell(self):
+        return
+
+    # Two packed cells are the same cell if they are at the same position in the same maze, this lets them be used as dictionary keys like cells
+    def __eq__(self, other):
+        return isinstance(other, PackedCell) and other.index == self.index and other.maze is self.maze
+
+    def __hash__(self):
+        return self.index
+
+    # The neighbouring cells are looked up when they are asked for, returning None at the edge of the maze as a cell does
+    @property
+    def north_cell(self):
+        return self.maze.cells[self.x_position][self.y_position + 1] if self.y_position + 1 < self.maze.height else None
+
+    @property
+    def east_cell(self):
+        return self.maze.cells[self.x_position + 1][self.y_position] if self.x_position + 1 < self.maze.width else None
+
+    @property
+    def south_cell(self):
+        return self.maze.cells[self.x_position][self.y_position - 1] if self.y_position - 1 >= 0 else None
+
+    @property
+    def west_cell(self):
+        return self.maze.cells[self.x_position - 1][self.y_position] if self.x_position - 1 >= 0 else None
+
+    # Wall slot returns where the given wall is stored, as the index of the array entry and the shift of its bits inside that entry
+    def wall_slot(self, wall):
+        return self.index + self.maze.slot_offsets[wall], PackedMaze.slot_shifts[wall]
+
+    # From the tremaux algorithm, when the robot drives through a wall, it is visited
+    def visit_wall(self, wall):
+        slot, shift = self.wall_slot(wall)
+        self.maze.visits[2 * slot + shift // PackedMaze.east_shift] += 1
+
+    # This method will take the wall given in the parameters and return how many times that wall has been visited according to the tremaux algorithm
+    def check_visited(self, wall):
+        slot, shift = self.wall_slot(wall)
+        return self.maze.visits[2 * slot + shift // PackedMaze.east_shift]
+
+    # When a cells wall state is inferred from the data the maze contains this function is called
+    def force_wall(self, wall, amount=2):
+        for visit in range(amount):
+            self.visit_wall(wall)
+        self.update_wall(wall, False)
+        slot, shift = self.wall_slot(wall)
+        self.maze.walls[slot] |= PackedMaze.forced_bit << shift
+
+    # To see if a cell wall's state has been assigned from context, this function checks the wall's forced bit
+    def check_forced(self, wall):
+        slot, shift = self.wall_slot(wall)
+        return self.maze.walls[slot] >> shift & PackedMaze.forced_bit != 0
+
+    # Update wall sets the given wall to known, and present if state is True. As with the nodes, a wall that is present is never removed again
+    def update_wall(self, wall, state):
+        slot, shift = self.wall_slot(wall)
+        known = self.maze.walls[slot] >> shift & PackedMaze.known_bit
+        if not known:
+            self.maze.count_known_wall(self.x_position, self.y_position, wall)
+        added = state and not self.maze.walls[slot] >> shift & PackedMaze.present_bit
+        bits = PackedMaze.known_bit | PackedMaze.present_bit if state else PackedMaze.known_bit
+        self.maze.walls[slot] |= bits << shift
+        self.maze.mark_wall_dirty(self.x_position, self.y_position, wall)
+        if added and self.maze.wall_listeners:
+            self.maze.notify_wall_added(self.x_position, self.y_position, wall)
+        elif not known and not state and self.maze.open_listeners:
+            self.maze.notify_wall_opened(self.x_position, self.y_position, wall)
+
+    def update_north(self, state):
+        self.update_wall(Walls.North, state)
+
+    def update_east(self, state):
+        self.update_wall(Walls.East, state)
+
+    def update_south(self, state):
+        self.update_wall(Walls.South, state)
+
+    def update_west(self, state):
+        self.update_wall(Walls.West, state)
+
+    # Checking if a wall in a cell is known can be done with this function
+    def wall_known(self, wall):
+        slot, shift = self.wall_slot(wall)
+        return self.maze.walls[slot] >> shift & PackedMaze.known_bit != 0
+
+    # To see if all of the walls in a cell are known, this function checks if each wall is known and if so returns True
+    def fully_known(self):
+        return self.maze.cell_fully_known(self.index)
+
+    # Check wall will return if a wall is present in a cell, regardless of if that wall's state is actually known
+    def check_wall(self, wall):
+        slot, shift = self.wall_slot(wall)
+        return self.maze.walls[slot] >> shift & PackedMaze.present_bit != 0
+
+    # The unicode characters are worked out from check_wall in the same way as a cell
+    get_unicode_char = Cell.get_unicode_char
+
+
+# The packed node stands in for a node when a packed maze is printed, working out which walls meet at its corner from the packed maze's arrays
+class PackedNode:
+    __slots__ = ('x_position', 'y_position', 'maze')
+
+    def __init__(self, x_pos, y_pos, maze):
+        self.x_position = x_pos
+        self.y_position = y_pos
+        self.maze = maze
+
+    # This method will return the unicode character that represents the walls meeting at this corner, in the same way as a node
+    def get_unicode_char(self):
+        maze = self.maze
+        x_pos = self.x_position
+        y_pos = self.y_position
+        node_state = 1
+        # The north and south links are the west walls of the cells above and below the corner, and the east and west links are the south walls of the cells to either side
+        if y_pos < maze.height and maze.slot_has(maze.cell_index(x_pos - 1, y_pos), PackedMaze.east_shift, PackedMaze.present_bit): node_state *= 2
+        if x_pos < maze.width and maze.slot_has(maze.cell_index(x_pos, y_pos - 1), 0, PackedMaze.present_bit): node_state *= 3
+        if y_pos > 0 and maze.slot_has(maze.cell_index(x_pos - 1, y_pos - 1), PackedMaze.east_shift, PackedMaze.present_bit): node_state *= 5
+        if x_pos > 0 and maze.slot_has(maze.cell_index(x_pos - 1, y_pos - 1), 0, PackedMaze.present_bit): node_state *= 7
+        return Node.unicode_chars[node_state]
+
+
+# The packed grid lets a packed maze's cells and nodes be accessed as grid[x_pos][y_pos], the same as the nested lists of a maze
+# Each access creates the packed cell or node asked for, so nothing is stored for squares which are never looked at
+class PackedGrid:
+    def __init__(self, maze, item_type, width, height):
+        self.maze = maze
+        self.item_type = item_type
+        self.width = width
+        self.height = height
+
+    def __len__(self):
+        return self.width
+
+    def __getitem__(self, x_pos):
+        if x_pos < 0: x_pos += self.width
+        if not 0 <= x_pos < self.width:
+            raise IndexError('maze grid index out of range')
+        return PackedColumn(self, x_pos)
+
+    def __iter__(self):
+        for x_pos in range(self.width):
+            yield PackedColumn(self, x_pos)
+
+
+# A packed column is one x position of a packed grid, indexed by the y position
+class PackedColumn:
+    __slots__ = ('grid', 'x_position')
+
+    def __init__(self, grid, x_pos):
+        self.grid = grid
+        self.x_position = x_pos
+
+    def __len__(self):
+        return self.grid.height
+
+    def __getitem__(self, y_pos):
+        if y_pos < 0: y_pos += self.grid.height
+        if not 0 <= y_pos < self.grid.height:
+            raise IndexError('maze grid index out of range')
+        return self.grid.item_type(self.x_position, y_pos, self.grid.maze)
+
+    def __iter__(self):
+        for y_pos in range(self.grid.height):
+            yield self.grid.item_type(self.x_position, y_pos, self.grid.maze)
+
+
+# The packed maze is an alternative storage for the maze which keeps every wall exactly once in flat integer arrays
+# Each cell stores its north and east walls, its south and west walls being the north and east walls of the cells below and to the left of it
+# An extra row and column of entries is kept below and to the left of the maze to hold the walls along its bottom and left edges
+class PackedMaze(Maze):
+    # Each wall uses three bits of a cell's entry, one for it being present, one for it being known and one for it being forced
+    # The north wall uses the lowest three bits and the east wall the three bits above them
+    present_bit = 1
+    known_bit = 2
+    forced_bit = 4
+    east_shift = 3
+    slot_shifts = (0, east_shift, 0, east_shift)
+    both_known = known_bit | known_bit << east_shift
+
+    def __init__(self, width, height, region_size=4):
+        Maze.__init__(self, width, height, region_size)
+        # The row length is the number of array entries per row, including the extra column on the left
+        self.row_length = width + 1
+        # The slot offsets move from a cell's index to the index of the entry holding each of its walls
+        self.slot_offsets = (0, 0, -self.row_length, -1)
+
+        self.walls = None
+        self.visits = None
+
+    # Initializing the packed maze creates the arrays, with every wall starting not present, not known and not forced
+    def initialize_maze(self):
+        size = self.row_length * (self.height + 1)
+        # Walls holds the bits of each entry's two walls, and visits holds two visit counts per entry, one for its north and one for its east wall
+        self.walls = array('B', bytes(size))
+        self.visits = array('H', bytes(4 * size))
+
+        self.cells = PackedGrid(self, PackedCell, self.width, self.height)
+        self.nodes = PackedGrid(self, PackedNode, self.width + 1, self.height + 1)
+
+    # This method returns the index of the array entry for the cell at (x_pos, y_pos), which can be -1 for the extra row and column
+    def cell_index(self, x_pos, y_pos):
+        return (y_pos + 1) * self.row_length + x_pos + 1
+
+    # Slot has checks if all of the given bits are set for the wall at the given entry and shift
+    def slot_has(self, slot, shift, bits):
+        return self.walls[slot] >> shift & bits == bits
+
+    # This method checks if every wall of the cell at the given index is known
+    def cell_fully_known(self, index):
+        walls = self.walls
+        # The north and east walls are in the cell's own entry, and the south and west walls in the entries below and to the left of it
+        own_known = walls[index] & PackedMaze.both_known == PackedMaze.both_known
+        south_known = walls[index - self.row_length] & PackedMaze.known_bit != 0
+        west_known = walls[index - 1] >> PackedMaze.east_shift & PackedMaze.known_bit != 0
+        return own_known and south_known and west_known
+
+    # Wall present reads the present bit of the wall straight from the arrays, without creating a packed cell
+    def wall_present(self, x_pos, y_pos, wall):
+        slot = (y_pos + 1) * self.row_length + x_pos + 1 + self.slot_offsets[wall]
+        return self.walls[slot] >> PackedMaze.slot_shifts[wall] & PackedMaze.present_bit != 0
+
+    # Wall blocked reads the bits of the wall straight from the arrays, a wall only being open when it is known and not present
+    def wall_blocked(self, x_pos, y_pos, wall):
+        slot = (y_pos + 1) * self.row_length + x_pos + 1 + self.slot_offsets[wall]
+        return self.walls[slot] >> PackedMaze.slot_shifts[wall] & 3 != PackedMaze.known_bit
+
+    # update_cell sets the wall of the cell at (x_pos, y_pos) directly, as the wall is only stored once there is no neighbouring cell to update
+    def update_cell(self, x_pos, y_pos, wall, state):
+        # Positions outside of the maze are ignored, as writing them would change the walls of a different cell
+        if not (0 <= x_pos < self.width and 0 <= y_pos < self.height):
+            return
+        slot = self.cell_index(x_pos, y_pos) + self.slot_offsets[wall]
+        shift = PackedMaze.slot_shifts[wall]
+        known = self.walls[slot] >> shift & PackedMaze.known_bit
+        if not known:
+            self.count_known_wall(x_pos, y_pos, wall)
+        added = state and not self.walls[slot] >> shift & PackedMaze.present_bit
+        bits = PackedMaze.known_bit | PackedMaze.present_bit if state else PackedMaze.known_bit
+        self.walls[slot] |= bits << shift
+        self.mark_wall_dirty(x_pos, y_pos, wall)
+        if added and self.wall_listeners:
+            self.notify_wall_added(x_pos, y_pos, wall)
+        elif not known and not state and self.open_listeners:
+            self.notify_wall_opened(x_pos, y_pos, wall)
+
+    # This works the same as the maze's extrapolate_edges, but reads the bits of the cell at the given index directly
+    def extrapolate_index(self, index):
+        walls = self.walls
+        east_shift = PackedMaze.east_shift
+        # A wall is closed when it is present and known, or when it has been forced
+        closed = []
+        for bits in (walls[index], walls[index] >> east_shift, walls[index - self.row_length], walls[index - 1] >> east_shift):
+            closed.append(bits & 3 == 3 or bits & PackedMaze.forced_bit != 0)
+        if closed.count(False) != 1 or self.cell_fully_known(index):
+            return 0
+        # The one wall which is not closed is forced open, exactly as a cell's force_wall would
+        wall = closed.index(False)
+        slot = index + self.slot_offsets[wall]
+        shift = PackedMaze.slot_shifts[wall]
+        x_pos = index % self.row_length - 1
+        y_pos = index // self.row_length - 1
+        known = walls[slot] >> shift & PackedMaze.known_bit
+        if not known:
+            self.count_known_wall(x_pos, y_pos, wall)
+        self.visits[2 * slot + shift // east_shift] += 2
+        walls[slot] |= (PackedMaze.known_bit | PackedMaze.forced_bit) << shift
+        self.mark_wall_dirty(x_pos, y_pos, wall)
+        if not known and self.open_listeners:
+            self.notify_wall_opened(x_pos, y_pos, wall)
+        return 1
+
+    def extrapolate_edges(self, cell):
+        return self.extrapolate_index(cell.index)
+
+    # Infer walls works through the dirty cells by their index, without creating a packed cell for each of them
+    def infer_walls(self):
+        amount_changed = 0
+        while self.dirty_cells:
+            position = self.dirty_cells.pop()
+            self.dirty_set.discard(position)
+            amount_changed += self.extrapolate_index(self.cell_index(position[0], position[1]))
+            if self.components is not None:
+                amount_changed += self.components.join_open_walls(position[0], position[1])
+        return amount_changed
+
+    # Fix Actually known corners checks every cell in the maze if it can extrapolate any edges, in the same order as the maze does
+    def fix_actually_known_corners(self):
+        amount_changed = 0
+        for x_pos in range(self.width):
+            index = self.cell_index(x_pos, 0)
+            for y_pos in range(self.height):
+                amount_changed += self.extrapolate_index(index)
+                index += self.row_length
+        return amount_changed
+
+
+# Sparse entries work like the arrays of a packed maze, except that an entry is only stored once it is written to
+# Reading an entry that has never been written gives 0, the same as an untouched array entry, without storing anything
+class SparseEntries(dict):
+    def __missing__(self, key):
+        return 0
+
+
+# The sparse maze stores its walls the same way as a packed maze, but in dictionaries that only hold the walls that have been written to
+# Creating a sparse maze takes the same time whatever size it is, and it only uses memory for the parts of the maze the robot has found out about
+class SparseMaze(PackedMaze):
+    # Initializing the sparse maze only creates the empty dictionaries, no cells or walls are created until they are used
+    def initialize_maze(self):
+        self.walls = SparseEntries()
+        self.visits = SparseEntries()
+
+        self.cells = PackedGrid(self, PackedCell, self.width, self.height)
+        self.nodes = PackedGrid(self, PackedNode, self.width + 1, self.height + 1)
+
+    # This method returns the index of every cell that has a stored wall, in the order fix_actually_known_corners would reach them
+    # Only these cells can have three closed walls, so they are the only cells that need checking when extrapolating edges
+    def stored_cell_indices(self):
+        positions = set()
+        for slot in self.walls:
+            x_pos = slot % self.row_length - 1
+            y_pos = slot // self.row_length - 1
+            # Each entry holds the north wall shared with the cell above it and the east wall shared with the cell to its right
+            for x_cell, y_cell in ((x_pos, y_pos), (x_pos, y_pos + 1), (x_pos + 1, y_pos)):
+                if 0 <= x_cell < self.width and 0 <= y_cell < self.height:
+                    positions.add((x_cell, y_cell))
+        return [self.cell_index(x_pos, y_pos) for x_pos, y_pos in sorted(positions)]
+
+    # Fix Actually known corners only checks the cells next to a stored wall, as every other cell has no known walls to extrapolate from
+    def fix_actually_known_corners(self):
+        amount_changed = 0
+        for index in self.stored_cell_indices():
+            amount_changed += self.extrapolate_index(index)
+        return amount_changed
+
+
+# The motion costs are the robot's one model of how long each of its movements take, and every choice of which way to turn or drive is made with them
+# The default times are for full velocity on the platform, where driving a cell takes 1.25 seconds forward or in reverse and a 90 degree turn 1.2 seconds
+# Taking a distance reading, starting a new drive and changing between forward and reverse take no extra time there,
+# but each can be set for a robot that needs time to take a reading, to get going, or to stop before changing direction
+class MotionCosts:
+    def __init__(self, drive_time=1.25, reverse_time=1.25, turn_time=1.2, scan_time=0.0, drive_start_time=0.0, direction_change_time=0.0):
+        self.drive_time = drive_time
+        self.reverse_time = reverse_time
+        self.turn_time = turn_time
+        self.scan_time = scan_time
+        self.drive_start_time = drive_start_time
+        self.direction_change_time = direction_change_time
+
+    # Turn returns the seconds taken to turn the given number of degrees
+    def turn(self, degrees):
+        return self.turn_time * degrees / 90
+
+    # Turn between returns the seconds turn_to_heading takes to get from one heading to the other, as it always goes the shortest way around
+    def turn_between(self, heading, next_heading):
+        return self.turn(abs((next_heading - heading + 180) % 360 - 180))
+
+    # Along returns the seconds taken to drive the given number of cells in the direction of the drive heading from the heading, and if it is quicker to do so in reverse
+    # Driving forward turns to the drive heading first, and reversing turns to face the other way first. Forward is used when both take the same time
+    def along(self, heading, drive_heading, cells=1):
+        forward = self.turn_between(heading, drive_heading) + cells * self.drive_time
+        reverse = self.turn_between(heading, drive_heading + 180) + cells * self.reverse_time
+        if reverse < forward:
+            return reverse, True
+        return forward, False
+
+    # Through wall returns the seconds taken to drive the given number of cells through the given wall from the heading, and if it is quicker to do so in reverse
+    def through_wall(self, heading, wall, cells=1):
+        return self.along(heading, 90 * wall, cells)
+
+
 # The robot object is what manages the state and movement of the robot
 class Robot:
     # This constructor sets up all of the robots properties
@@ -521,13 +2217,269 @@ class Robot:
         self.short_tolerance = 100
         self.short_turn_offset = 30
 
-    # This method is called to make the robot drive through one square
+        # With long range scans a reading looks down the whole corridor in front of the robot, as long as the robot is stopped and within the square tolerance,
+        # in degrees, of facing straight along it. Readings of the sensor range or more found no wall at all, so only the walls they passed through are used
+        self.long_range_scans = False
+        self.square_tolerance = 2
+        self.sensor_range = 3000
+
+        # With sweep scans a wall is read as the robot turns past it, within the sweep window in degrees either side of facing it
+        # The heading is polled every sweep interval in msec, which must be short enough that the window is never turned straight through between polls
+        self.sweep_scans = False
+        self.sweep_window = 3
+        self.sweep_interval = 10
+
+        # With smooth paths the speed run drives straight lines at any angle between cells of the route, wherever the robot fits between the walls
+        # The robot width is how wide a gap the robot needs, in the distance unit. It must be less than the maze cell length, or no corridor would be wide enough
+        self.smooth_paths = False
+        self.robot_width = 200
+
+        # The scan plans table holds the cheapest turns for looking at a set of walls, worked out the first time each one is needed
+        self.scan_plans = {}
+
+        # The motion costs are how long the robot's movements take, which the route planners, the scan planner and the choice of which way to drive all use
+        # They should be set before exploring, as the scan plans table is worked out from them
+        self.costs = MotionCosts()
+
+        # When a route is given with finish_when_route_proven, exploration stops as soon as the shortest route along it is certain, rather than once every wall is known
+        # The known route length is the length of the shortest route through walls known to be open, found each time exploration checks if it is finished
+        self.route = None
+        self.known_route_length = None
+
+        # The time budget is the seconds exploration may take from the budget start, a time read from the brain's timer
+        self.time_budget = None
+        self.budget_start = 0
+
+        # When regions are pruned with prune_regions, the relevant cells are the maze's cells that could be on the route, and every other cell is ignored
+        self.relevant = None
+
+    # Finish when route proven makes exploration stop once the shortest route from (x_start, y_start) to (x_end, y_end) can not get any shorter
+    # This is the case when the shortest route through walls known to be open is as short as the shortest route treating every unknown wall as open
+    def finish_when_route_proven(self, x_start, y_start, x_end, y_end):
+        self.route = (x_start, y_start, x_end, y_end)
+
+    # Prune regions makes exploration ignore every cell that can not be on a route from (x_start, y_start) to (x_end, y_end)
+    # Exploration then finishes once every wall between the cells that could be on the route is known
+    def prune_regions(self, x_start, y_start, x_end, y_end):
+        self.relevant = self.maze.relevant_cells(x_start, y_start, x_end, y_end)
+
+    # Wall ignored returns if the given wall of the cell at (x_pos, y_pos) leads into a cell that is being ignored, so it does not need looking at
+    # When a route has been given a wall is also ignored if either cell could not be on a route shorter than the known one, as it can not shorten the route
+    def wall_ignored(self, x_pos, y_pos, wall):
+        if self.relevant is None and self.route is None:
+            return False
+        x_next = x_pos + wall_x_offsets[wall]
+        y_next = y_pos + wall_y_offsets[wall]
+        if not (0 <= x_next < self.maze.width and 0 <= y_next < self.maze.height):
+            return False
+        return not self.cell_useful(x_next, y_next) or not self.cell_useful(x_pos, y_pos)
+
+    # Set time budget lets exploration take the given number of seconds from now, after which it stops with the best route found so far
+    def set_time_budget(self, seconds):
+        self.time_budget = seconds
+        self.budget_start = brain.timer_time(SECONDS)
+
+    # Out of time returns if a time budget has been set and it has run out
+    def out_of_time(self):
+        return self.time_budget is not None and brain.timer_time(SECONDS) - self.budget_start >= self.time_budget
+
+    # Exploration finished returns True once every wall is known, or when a route has been given, once the shortest route along it is proven
+    # It also returns True once the time budget has run out, or when regions are pruned, once every wall between the relevant cells is known
+    def exploration_finished(self):
+        if self.maze.all_cells_known():
+            return True
+        if self.relevant is not None and self.relevant.all_walls_known():
+            return True
+        if self.route is not None and self.route_gap() == 0:
+            return True
+        return self.out_of_time()
+
+    # Route gap returns how many cells longer than the shortest possible route the shortest route through walls known to be open could be,
+    # or None if there is no route through walls known to be open yet. It also updates the known route length
+    def route_gap(self):
+        x_start, y_start, x_end, y_end = self.route
+        self.known_route_length = self.maze.path_service().distance(x_start, y_start, x_end, y_end, known_only=True)
+        if self.known_route_length is None:
+            return None
+        # The distance field treats unknown walls as open, so it gives the shortest the route could possibly be
+        return self.maze.distance_field(x_end, y_end).optimality_gap(x_start, y_start, self.known_route_length)
+
+    # Worth scanning returns if the cell at (x_pos, y_pos) has walls that are not known which could still make a difference
+    # Without a route or pruned regions every such cell is worth scanning. Otherwise only a cell with an unknown wall into another cell that is not ignored is
+    def worth_scanning(self, x_pos, y_pos):
+        if self.maze.cells[x_pos][y_pos].fully_known():
+            return False
+        if self.relevant is None and self.route is None:
+            return True
+        for wall in range(4):
+            x_next = x_pos + wall_x_offsets[wall]
+            y_next = y_pos + wall_y_offsets[wall]
+            if 0 <= x_next < self.maze.width and 0 <= y_next < self.maze.height and not self.maze.wall_known(x_pos, y_pos, wall):
+                if not self.wall_ignored(x_pos, y_pos, wall):
+                    return True
+        return False
+
+    # Cell useful returns if the cell at (x_pos, y_pos) could be on the route, being one of the relevant cells when regions are pruned,
+    # and when a route has been given, reachable from both of its ends and on a route between them shorter than the known route
+    def cell_useful(self, x_pos, y_pos):
+        if self.relevant is not None and not self.relevant.contains(x_pos, y_pos):
+            return False
+        if self.route is None:
+            return True
+        x_start, y_start, x_end, y_end = self.route
+        from_start = self.maze.distance_field(x_start, y_start).distance(x_pos, y_pos)
+        to_end = self.maze.distance_field(x_end, y_end).distance(x_pos, y_pos)
+        if from_start is None or to_end is None:
+            return False
+        return self.known_route_length is None or from_start + to_end < self.known_route_length
+
+    # Targeted scanning returns if the tremaux algorithm should only drive into cells worth scanning, driving straight to the nearest one when there are none next to it
+    # This is the case when a route has been given, and with long range scans, which make cells known without the robot visiting them so its marks no longer show what is left to find
+    def targeted_scanning(self):
+        return self.route is not None or self.long_range_scans
+
+    # Heading for goal returns if exploration should make straight for the end of the given route, which it does until a route through walls known to be open is found
+    # This way a route is known as early as possible, so stopping when the time budget runs out still leaves one to use
+    def heading_for_goal(self):
+        return self.route is not None and self.known_route_length is None
+
+    # Goal distance returns how many cells the cell at (x_pos, y_pos) is from the end of the given route, treating walls that are not known as open,
+    # or None if the end can not be reached from it
+    def goal_distance(self, x_pos, y_pos):
+        return self.maze.distance_field(self.route[2], self.route[3]).distance(x_pos, y_pos)
+
+    # Goal wall returns the wall known to be open from the cell at (x_pos, y_pos) into whichever neighbour is closest to the end of the given route,
+    # the quickest to drive through from the robot's heading when several are as close, or None if the cell has no such wall
+    def goal_wall(self, x_pos, y_pos):
+        heading = drivetrain.heading(self.angle_unit)
+        best = None
+        for wall in range(4):
+            if self.maze.wall_blocked(x_pos, y_pos, wall):
+                continue
+            distance = self.goal_distance(x_pos + wall_x_offsets[wall], y_pos + wall_y_offsets[wall])
+            if distance is None:
+                continue
+            option = (distance, self.costs.through_wall(heading, wall)[0], wall)
+            if best is None or option < best:
+                best = option
+        return None if best is None else best[2]
+
+    # Plan fastest route finds the quickest route to drive from (x_start, y_start) to (x_end, y_end) starting out facing the given wall, using the robot's motion costs
+    def plan_fastest_route(self, x_start, y_start, x_end, y_end, start_heading, known_only=False):
+        return self.maze.pathfind_fastest(x_start, y_start, x_end, y_end, start_heading, self.costs, known_only)
+
+    # Plan frontier route finds the quickest route from where the robot is, facing the way it is, to the nearest cell that still has a wall that is not known
+    # The route only goes through walls known to be open. It returns None when no such cell can be reached
+    def plan_frontier_route(self):
+        x_pos, y_pos = self.get_current_cell_location()
+        return self.maze.pathfind_fastest(x_pos, y_pos, None, None, self.get_facing_wall(), self.costs, known_only=True, is_target=self.worth_scanning)
+
+    # This method is called to make the robot drive through one square, or through the given number of squares in a row as a single drive
     # the forward parameter sets which way the robot should drive
-    def drive_square(self, forward):
+    def drive_square(self, forward, cells=1):
         drive_direction = FORWARD if forward else REVERSE
-        drivetrain.drive_for(drive_direction, self.maze_cell_length, self.distance_unit)
+        drivetrain.drive_for(drive_direction, cells * self.maze_cell_length, self.distance_unit)
         return
 
+    # Straight segments splits a path of (x, y) positions into the straight runs along it, as [wall, cells] pairs of the wall driven through and how many cells in a row
+    def straight_segments(self, path):
+        segments = []
+        for index in range(len(path) - 1):
+            wall = wall_between(path[index][0], path[index][1], path[index + 1][0], path[index + 1][1])
+            if segments and segments[-1][0] == wall:
+                segments[-1][1] += 1
+            else:
+                segments.append([wall, 1])
+        return segments
+
+    # Smooth legs splits a path of (x, y) positions into straight lines between cells of the path, as (heading, cells) pairs of the heading of each line and its length
+    # Each line runs from the cell the last one ended at to the furthest cell along the path the robot can drive straight to, which is at least the next cell
+    def smooth_legs(self, path):
+        legs = []
+        start = 0
+        while start < len(path) - 1:
+            end = len(path) - 1
+            while end > start + 1 and not self.line_clear(path[start], path[end]):
+                end -= 1
+            x_length = path[end][0] - path[start][0]
+            y_length = path[end][1] - path[start][1]
+            legs.append((math.degrees(math.atan2(x_length, y_length)) % 360, math.hypot(x_length, y_length)))
+            start = end
+        return legs
+
+    # Line clear returns if the robot can drive in a straight line between the centres of the cells at the two (x, y) positions without touching a wall
+    # Every wall that is present or not known in and around the cells the line crosses is kept at least half of the robot width away from the line
+    def line_clear(self, start, end):
+        clearance = self.robot_width / 2 / self.maze_cell_length
+        line_start = (start[0] + 0.5, start[1] + 0.5)
+        line_end = (end[0] + 0.5, end[1] + 0.5)
+        for x_pos in range(max(0, min(start[0], end[0]) - 1), min(self.maze.width, max(start[0], end[0]) + 2)):
+            for y_pos in range(max(0, min(start[1], end[1]) - 1), min(self.maze.height, max(start[1], end[1]) + 2)):
+                for wall in range(4):
+                    if not self.maze.wall_blocked(x_pos, y_pos, wall):
+                        continue
+                    wall_start, wall_end = wall_ends[wall]
+                    wall_start = (x_pos + wall_start[0], y_pos + wall_start[1])
+                    wall_end = (x_pos + wall_end[0], y_pos + wall_end[1])
+                    if segment_distance(line_start, line_end, wall_start, wall_end) < clearance:
+                        return False
+        return True
+
+    # Drive path drives the robot along a path of (x, y) positions starting from the cell it is in, without checking any of the walls on the way
+    # Each straight run is a single drive, turning only at the corners, and like drive_through_wall it is driven in reverse when the motion costs say that is quicker
+    # With smooth paths the runs are the straight lines from smooth_legs instead, which can be at any angle
+    def drive_path(self, path):
+        if self.smooth_paths:
+            legs = self.smooth_legs(path)
+        else:
+            legs = [(90 * wall, cells) for wall, cells in self.straight_segments(path)]
+        for leg_heading, cells in legs:
+            seconds, reverse = self.costs.along(drivetrain.heading(self.angle_unit), leg_heading, cells)
+            drivetrain.turn_to_heading((leg_heading + 180) % 360 if reverse else leg_heading, self.angle_unit)
+            drivetrain.drive_for(REVERSE if reverse else FORWARD, cells * self.maze_cell_length, self.distance_unit)
+
+    # Speed run drives the robot along the path, which goes from the start to the end, as quickly as it can once the maze has been mapped
+    # If the robot is not in the start cell it first drives back there with drive_to_cell
+    # A path through a wall that is not known to be open, such as one planned treating unknown walls as open, is planned again through known walls only
+    # It returns the seconds the run from the start to the end took, or None if there is no route it can be sure of
+    def speed_run(self, path):
+        (x_start, y_start), (x_end, y_end) = path[0], path[-1]
+        for index in range(len(path) - 1):
+            if self.maze.wall_blocked(path[index][0], path[index][1], wall_between(path[index][0], path[index][1], path[index + 1][0], path[index + 1][1])):
+                path = self.maze.path_service().find_path(x_start, y_start, x_end, y_end, known_only=True)
+                break
+        if path is None:
+            return None
+
+        # The drive back is not timed, so it goes through the incremental planner, which can use walls that are not known yet by checking them on the way
+        if not self.drive_to_cell(x_start, y_start):
+            return None
+
+        start_time = brain.timer_time(SECONDS)
+        self.drive_path(path)
+        return brain.timer_time(SECONDS) - start_time
+
+    # Drive to cell drives the robot to the cell at (x_end, y_end), checking each wall it is about to drive through that is not yet known
+    # The route is kept by the maze's incremental planner, so when a wall turns out to be in the way only the part of the route it affects is planned again
+    # It returns True once the robot is in the cell, or False if the walls found leave no way to reach it
+    def drive_to_cell(self, x_end, y_end):
+        while True:
+            x_pos, y_pos = self.get_current_cell_location()
+            if (x_pos, y_pos) == (x_end, y_end):
+                return True
+            next_cell = self.maze.incremental_planner(x_end, y_end, x_pos, y_pos).next_cell()
+            if next_cell is None:
+                return False
+            wall = wall_between(x_pos, y_pos, next_cell[0], next_cell[1])
+            current_cell = self.get_current_cell()
+            # A wall that is not known is looked at before driving through it, if it is there the planner has been told and the route is planned again
+            if not current_cell.wall_known(wall):
+                self.turn_to_wall(wall)
+                if current_cell.check_wall(wall):
+                    continue
+            current_cell.visit_wall(wall)
+            self.drive_through_wall(wall)
+
     # To get the current position of the robot as x, y co-ordinates, this method is used
     def get_current_cell_location(self):
         x_pos = location.position(X, MM) + 1000
@@ -579,24 +2531,18 @@ class Robot:
         target_wall_heading %= 360
         drivetrain.turn_to_heading(target_wall_heading, self.angle_unit)
 
-    # Drive through wall is used when the robot needs to drive through a square at the wall specified
-    def drive_through_wall(self, wall):
-        facing_wall = self.get_facing_wall()
-        # To decide if the robot should travel forward or reverse to increase speed, the wall is checked for if it is in front, or directly behind the robot
-        if facing_wall == wall:
-            self.turn_to_wall(wall)
-            # For each of the different cases, for the direction needed to turn to go through the wall
-            # Following making the appropriate turn, the robot drives through a length of the maze grid size using the method below
-            self.drive_square(True)
-            return
-        # This check will see if the wall is not in front or behind the wall
-        if wall % 2 != facing_wall % 2:
+    # Drive through wall is used when the robot needs to drive through a square at the wall specified, and carry on through the given number of squares in a row
+    def drive_through_wall(self, wall, cells=1):
+        # To decide if the robot should travel forward or reverse to increase speed, the motion costs compare turning to face the wall with turning to face away from it
+        seconds, reverse = self.costs.through_wall(drivetrain.heading(self.angle_unit), wall, cells)
+        if not reverse:
             self.turn_to_wall(wall)
-            self.drive_square(True)
+            # Following making the appropriate turn, the robot drives through a length of the maze grid size for each square using the method below
+            self.drive_square(True, cells)
             return
-        # If the wall is behind the robot, it squares up the robot to face the facing wall fully, and then reverses
+        # If reversing is quicker, it squares up the robot to face away from the wall fully, and then reverses
         self.turn_to_wall((wall + 2) % 4)
-        self.drive_square(False)
+        self.drive_square(False, cells)
 
     # The check forward wall is called to check a wall that the robot is looking at
     # It will return True if a wall is present
@@ -618,17 +2564,44 @@ class Robot:
         state = distance_to_wall < tolerance
         # The maze is then updated with the new knowledge of the wall
         self.maze.update_cell(current_position[0], current_position[1], facing_wall, state)
+        # A reading taken fully facing the wall can also tell the robot about the walls further along, if it was taken while settled
+        if full and not state and self.long_range_scans and self.is_settled():
+            self.infer_along_reading(current_position[0], current_position[1], facing_wall, distance_to_wall)
 
         # Following the update of the cell, the robot checks to see if there are any corners who's values it can infer
         # This check must not be done inside the update function itself, as it exceeds the vexcode vr's platform recursion limits for functions
-        fixed_corners = -1
-        while fixed_corners != 0:
-            fixed_corners = self.maze.fix_actually_known_corners()
+        self.maze.infer_walls()
 
         # following this the value of the wall just checked is returned. This is checked rather than returned from the state as the wall may have been overridden with static data
         # This is the case with the walls at the south of the starting point and the north of the ending point
         return self.get_current_cell().check_wall(facing_wall)
 
+    # Is settled returns if the robot is stopped and facing straight along one of the maze's walls, so a distance reading can be trusted to its full length
+    def is_settled(self):
+        if drivetrain.is_moving():
+            return False
+        offset = drivetrain.heading(self.angle_unit) % 90
+        return min(offset, 90 - offset) <= self.square_tolerance
+
+    # Infer along reading uses a distance reading taken from the cell at (x_pos, y_pos) facing the given wall to set every wall the reading passed through as open
+    # The wall of the current cell is within the long tolerance, and each cell further along adds one cell length to the reading
+    # The wall the reading stopped at is set as present, unless the reading reached the sensor's range and so did not stop at a wall
+    def infer_along_reading(self, x_pos, y_pos, wall, distance_to_wall):
+        open_walls = int((distance_to_wall - self.long_tolerance) // self.maze_cell_length) + 1
+        found_wall = distance_to_wall < self.sensor_range
+        for step in range(1, open_walls + 1):
+            x_pos += wall_x_offsets[wall]
+            y_pos += wall_y_offsets[wall]
+            if not (0 <= x_pos < self.maze.width and 0 <= y_pos < self.maze.height):
+                return
+            # A wall the robot already knows about is trusted over the reading, which stops there
+            if self.maze.wall_known(x_pos, y_pos, wall):
+                if self.maze.wall_present(x_pos, y_pos, wall):
+                    return
+                continue
+            if step < open_walls or found_wall:
+                self.maze.update_cell(x_pos, y_pos, wall, step == open_walls)
+
     # This method checks if a wall is present when the robot is only partially facing the wall
     def check_short_forward(self):
         # Firstly details about the robots state are gotten
@@ -643,14 +2616,107 @@ class Robot:
 
         # Following the update of the cell, the robot checks to see if there are any corners who's values it can infer
         # This check must not be done inside the update function itself, as it exceeds the vexcode vr's platform recursion limits for functions
-        fixed_corners = -1
-        while fixed_corners != 0:
-            fixed_corners = self.maze.fix_actually_known_corners()
+        self.maze.infer_walls()
 
         # following this the value of the wall just checked is returned. This is checked rather than returned from the state as the wall may have been overridden with static data
         # This is the case with the walls at the south of the starting point and the north of the ending point
         return self.get_current_cell().check_wall(facing_wall)
 
+    # Scan walls looks at each of the given walls of the current cell, turning as little as possible in total
+    # Each turn is planned again from where the robot is, as a wall may have been inferred from the readings already taken and no longer need looking at
+    # The exit walls are the walls the robot will leave through afterwards, so the time to drive out through them can be counted too
+    # They are only given when the way out is already settled, as a guess that the readings then prove wrong costs more turning than it saves
+    def scan_walls(self, walls, exit_walls=()):
+        current_cell = self.get_current_cell()
+        heading = drivetrain.heading(self.angle_unit)
+        while True:
+            walls = [wall for wall in walls if not current_cell.wall_known(wall)]
+            if not walls:
+                return
+            wall, offset = self.plan_scan(walls, heading, exit_walls)[0]
+            if offset == 0:
+                self.turn_to_wall(wall)
+            else:
+                self.turn_short_to_wall(wall, offset < 0)
+                self.check_forward_wall(False)
+            heading = (90 * wall + offset) % 360
+
+    # Plan scan returns the turns that look at every one of the given walls from the heading in the least time, as a list of (wall, offset) pairs
+    # An offset of 0 turns fully to the wall, and an offset of the short turn offset either way stops short of it and uses the short tolerance
+    # The plans are kept in the scan plans table, keyed by the walls, the heading to the nearest degree and the exit walls, so each is only worked out once
+    def plan_scan(self, walls, heading, exit_walls=()):
+        return self.scan_plan(tuple(sorted(walls)), int(round(heading)) % 360, tuple(sorted(exit_walls)))[1]
+
+    # Scan plan returns the (total seconds, turns) entry of the scan plans table for the walls, the heading and the exit walls, timed with the motion costs
+    # The cheapest plan is found by trying every wall and offset as the next turn, with the rest of the plan coming from the table
+    # Each of the exit walls is taken to be as likely as the others, so driving out is counted as the average of the times to drive through each one
+    def scan_plan(self, walls, heading, exit_walls):
+        key = (walls, heading, exit_walls)
+        if key in self.scan_plans:
+            return self.scan_plans[key]
+        if not walls:
+            exit_turns = [self.costs.through_wall(heading, exit_wall)[0] for exit_wall in exit_walls]
+            best = (sum(exit_turns) / len(exit_turns) if exit_turns else 0, [])
+        else:
+            best = None
+            for wall in walls:
+                rest = tuple(other for other in walls if other != wall)
+                # Offsets are tried full turn first, so a full turn is used rather than a short one that turns just as far
+                for offset in (0, self.short_turn_offset, -self.short_turn_offset):
+                    next_heading = (90 * wall + offset) % 360
+                    turned, turns = self.scan_plan(rest, next_heading, exit_walls)
+                    turned += self.costs.turn_between(heading, next_heading) + self.costs.scan_time
+                    if best is None or turned < best[0]:
+                        best = (turned, [(wall, offset)] + turns)
+        self.scan_plans[key] = best
+        return best
+
+    # Plan sweeps returns the sweeps that pass every one of the given walls with the least turning, as a list of (direction, angle) turns
+    # A sweep can turn one way past some of the walls and then back the other way past the rest, and each sweep stops a short turn before its last wall
+    def plan_sweeps(self, walls):
+        if not walls:
+            return []
+        heading = drivetrain.heading(self.angle_unit)
+        best = None
+        for first, second in ((LEFT, RIGHT), (RIGHT, LEFT)):
+            # Walls are sorted by how far the first sweep has to turn to face them, the first split of them are swept first and the rest on the way back
+            angles = sorted(self.angle_to_wall(heading, wall, first) for wall in walls)
+            for split in range(len(angles) + 1):
+                sweeps = []
+                end = 0
+                if split > 0:
+                    end = max(0, angles[split - 1] - self.short_turn_offset)
+                    sweeps.append((first, end))
+                if split < len(angles):
+                    # Turning back, the remaining walls are the rest of the way around from where the first sweep started
+                    back = end + 360 - angles[split] - self.short_turn_offset
+                    sweeps.append((second, max(0, back)))
+                turned = self.costs.turn(sum(angle for direction, angle in sweeps))
+                if best is None or turned < best[0]:
+                    best = (turned, sweeps)
+        return best[1]
+
+    # Angle to wall returns how many degrees the robot has to turn in the given direction from the heading to face the given wall
+    def angle_to_wall(self, heading, wall, direction):
+        if direction == LEFT:
+            return (heading - 90 * wall) % 360
+        return (90 * wall - heading) % 360
+
+    # Sweep scan turns the given angle in the given direction without waiting for the turn to finish, polling the heading as it goes
+    # Each wall of the current cell that is not known is read as the robot passes within the sweep window of facing it,
+    # and a wall that is not known when the turn finishes, the short turn before the last wall, is read with the short tolerance
+    def sweep_scan(self, direction, angle):
+        current_cell = self.get_current_cell()
+        drivetrain.turn_for(direction, angle, self.angle_unit, wait=False)
+        while drivetrain.is_moving():
+            heading = drivetrain.heading(self.angle_unit)
+            offset = heading % 90
+            if min(offset, 90 - offset) <= self.sweep_window and not current_cell.wall_known(int((heading + 45) % 360 // 90)):
+                self.check_forward_wall(True)
+            wait(self.sweep_interval, MSEC)
+        if not current_cell.wall_known(self.get_facing_wall()):
+            self.check_short_forward()
+
     def check_junction(self):
         # To check a junction, the current cell is gotten from the get_current_cell method
         current_cell = self.get_current_cell()
@@ -665,59 +2731,59 @@ class Robot:
         wall_one = self.check_forward_wall(True)
 
         # Here we check if the wall is known, and if it is the value is saved to the wall_(wall number) variable
+        # A wall leading into a cell that is being ignored is not looked at, and is treated as present so that it is not driven through
+        x_pos, y_pos = current_cell.x_position, current_cell.y_position
         if current_cell.wall_known(wall_zero_direction):
             wall_zero = current_cell.check_wall(wall_zero_direction)
+        elif self.wall_ignored(x_pos, y_pos, wall_zero_direction):
+            wall_zero = True
         else:
             wall_zero = None
 
         if current_cell.wall_known(wall_two_direction):
             wall_two = current_cell.check_wall(wall_two_direction)
+        elif self.wall_ignored(x_pos, y_pos, wall_two_direction):
+            wall_two = True
         else:
             wall_two = None
 
         if current_cell.wall_known(wall_three_direction):
             wall_three = current_cell.check_wall(wall_three_direction)
+        elif self.wall_ignored(x_pos, y_pos, wall_three_direction):
+            wall_three = True
         else:
             wall_three = None
 
-        # To ensure the smallest amount of turning is used, the following series of if statements are used
-        # The first set is all the cases of walls not being known, given the wall to the left (wall_zero) is not known
-        if wall_zero is None:
-            if wall_three is None:
-                self.turn_to_wall(wall_zero_direction)
-                wall_zero = self.check_forward_wall(True)
-                if wall_two is None:
-                    self.turn_to_wall(wall_three_direction)
-                    wall_three = self.check_forward_wall(True)
-                    self.turn_short_to_wall(wall_two_direction, True)
-                    wall_two = self.check_forward_wall(False)
-                else:
-                    self.turn_short_to_wall(wall_three_direction, False)
-                    wall_three = self.check_forward_wall(False)
-            elif wall_two is None:
-                self.turn_short_to_wall(wall_zero_direction, False)
-                wall_zero = self.check_forward_wall(False)
-                self.turn_short_to_wall(wall_two_direction, True)
-                wall_two = self.check_forward_wall(False)
-            else:
-                self.turn_short_to_wall(wall_zero_direction, False)
-                wall_zero = self.check_forward_wall(False)
-        # The next set checks what walls to the right of the robot are present, given the wall to the left is known
-        elif wall_two is None:
-            if wall_three is None:
-                self.turn_to_wall(wall_two_direction)
-                wall_two = self.check_forward_wall(True)
-                self.turn_short_to_wall(wall_three_direction, True)
-                wall_three = self.check_forward_wall(False)
-            else:
-                self.turn_short_to_wall(wall_two_direction, True)
-                wall_two = self.check_forward_wall(False)
-        # Even if the left and right walls are known, we may be able to extract more data by checking the wall again as we pass it, as this does not incur a time loss
-        elif wall_three is None:
-            self.turn_to_wall(wall_two_direction)
-            wall_two = self.check_forward_wall(True)
-            self.turn_short_to_wall(wall_three_direction, True)
-            wall_three = self.check_forward_wall(False)
+        # Every wall that is still not known is then looked at, either by sweeping past it or by the turns the scan planner picks
+        # With sweep scans a wall the sweeps somehow missed is turned to and checked directly, so the robot never drives through a wall it has not looked at
+        # Without them the planner is only told the wall the robot will leave through when no reading could change it, which is when
+        # the robot is heading for the goal and one wall known to be open leads closer to it than any other wall. Otherwise the choice
+        # depends on what the readings find and on the heading they leave the robot at, so the planner just turns as little as it can
+        states = {wall_zero_direction: wall_zero, wall_one_direction: wall_one, wall_two_direction: wall_two, wall_three_direction: wall_three}
+        exits = []
+        if self.heading_for_goal():
+            distances = []
+            for direction in states:
+                if states[direction] or self.wall_ignored(x_pos, y_pos, direction):
+                    continue
+                distance = self.goal_distance(x_pos + wall_x_offsets[direction], y_pos + wall_y_offsets[direction])
+                if distance is not None:
+                    distances.append((distance, states[direction] is None, direction))
+            distances.sort()
+            if distances and not distances[0][1] and (len(distances) == 1 or distances[1][0] > distances[0][0]):
+                exits = [distances[0][2]]
+        unknown = [direction for direction, state in ((wall_zero_direction, wall_zero), (wall_two_direction, wall_two), (wall_three_direction, wall_three)) if state is None]
+        if self.sweep_scans:
+            for direction, angle in self.plan_sweeps(unknown):
+                self.sweep_scan(direction, angle)
+            for direction in unknown:
+                if not current_cell.wall_known(direction):
+                    self.turn_to_wall(direction)
+        else:
+            self.scan_walls(unknown, exits)
+        wall_zero = wall_zero if wall_zero is not None else current_cell.check_wall(wall_zero_direction)
+        wall_two = wall_two if wall_two is not None else current_cell.check_wall(wall_two_direction)
+        wall_three = wall_three if wall_three is not None else current_cell.check_wall(wall_three_direction)
 
         # The walls are then sorted by the direction value which corresponds to the Walls enum
         # This ensures that the values returned by this function are in the same order every time
@@ -741,51 +2807,188 @@ class Robot:
         while not finished:
 
             # Every loop it will check if it can infer any edges
-            fixed_corners = -1
-            while fixed_corners != 0:
-                fixed_corners = self.maze.fix_actually_known_corners()
+            self.maze.infer_walls()
 
             # it then updated the finiched variable and returns if it is finished
-            finished = self.maze.all_cells_known()
+            finished = self.exploration_finished()
             if finished: return
 
             # The current maze interpretation is then printed as a nice visual progress display
             brain.clear()
             self.maze.print_plain()
+            brain_print_line("Unknown walls: " + str(self.maze.unknown_walls()))
 
             # variables are then created about the current state of the robot
             current_cell = self.get_current_cell()
+            x_pos, y_pos = current_cell.x_position, current_cell.y_position
+
+            # When regions are pruned and the robot has found itself in a cell that is being ignored, it heads straight back to the relevant cells
+            # If it can not get back there is nothing more that matters for it to find, so the exploration ends
+            if self.relevant is not None and not self.relevant.contains(x_pos, y_pos):
+                if not self.return_to_relevant_cells():
+                    return
+                continue
             facing_wall = self.get_facing_wall()
 
-            # The paths returned by the junction check are then checks for how many times they have been visited
-            possible_paths = []
-            junction_states = self.check_junction()
-            for index in range(len(junction_states)):
-                if not junction_states[index]:
-                    times_visited = current_cell.check_visited(index)
-                    possible_paths.append((times_visited, index))
-
-            # They are then sorted
-            possible_paths.sort()
-            next_direction = None
-
-            # The next direction is chosen giving priority to easier to reach paths (less turning)
-            min_visited = possible_paths[0][0]
-            for pair in possible_paths:
-                if pair[1] == facing_wall and pair[0] == min_visited:
-                    next_direction = pair[1]
-
-            if next_direction is None:
-                for pair in possible_paths:
-                    if pair[1] == (facing_wall + 2) % 4 and pair[0] == min_visited:
-                        next_direction = pair[1]
-
-            if next_direction is None:
-                next_direction = possible_paths[0][1]
-
-            # The path is then marked as visited and then the robot drives through it
+            # The junction is then checked, and the next direction picked from the walls found
+            # When scanning is targeted a cell with nothing worth scanning is not checked, and the direction is picked from the walls already known
+            if self.targeted_scanning() and not self.worth_scanning(x_pos, y_pos):
+                junction_states = [current_cell.check_wall(wall) if current_cell.wall_known(wall) else True for wall in range(4)]
+            else:
+                junction_states = self.check_junction()
+            heading = drivetrain.heading(self.angle_unit)
+            next_direction = self.tremaux_direction(current_cell, junction_states, facing_wall, heading)
+
+            # When scanning is targeted and no wall leads into a cell worth scanning, the robot drives to the nearest cell worth scanning instead
+            # If there is none it can reach there is nothing more that matters for it to find, so the exploration ends
+            if next_direction is None and self.targeted_scanning():
+                route = self.plan_frontier_route()
+                if route is None:
+                    return
+                self.drive_frontier_route(route, True)
+                continue
+
+            # The walls just found can leave the robot's own cell unable to be on the route, in which case it heads back to the relevant cells
+            # When the robot is already in a relevant cell with no way on, it has nowhere left to go and the exploration ends
+            if next_direction is None and self.relevant is not None:
+                if not self.return_to_relevant_cells():
+                    return
+                continue
+
+            # The path is then marked as visited and then the robot drives through it, carrying on through any known corridor beyond it in the same drive
             current_cell.visit_wall(next_direction)
-            self.drive_through_wall(next_direction)
+            cells = self.corridor_cells(x_pos, y_pos, next_direction, heading)
+            self.drive_through_wall(next_direction, cells)
+
+    # Tremaux direction picks the wall the tremaux algorithm drives through next from the cell, given if each of its walls is present, or None if there is none
+    # Paths into cells that are being ignored are left out, as they can not lead anywhere that matters
+    # When scanning is targeted, paths into cells with nothing worth scanning are left out too, and the robot drives to the nearest cell worth scanning instead
+    # While heading for the goal every open path is kept, and they are ranked by how far the cell they lead into is from the end rather than by their visits
+    def tremaux_direction(self, cell, wall_states, facing_wall, heading):
+        x_pos, y_pos = cell.x_position, cell.y_position
+        towards_goal = self.heading_for_goal()
+
+        # The open paths are checked for how many times they have been visited and then sorted
+        possible_paths = []
+        for index in range(len(wall_states)):
+            if wall_states[index] or self.wall_ignored(x_pos, y_pos, index):
+                continue
+            x_next = x_pos + wall_x_offsets[index]
+            y_next = y_pos + wall_y_offsets[index]
+            if towards_goal:
+                possible_paths.append((self.goal_distance(x_next, y_next), index))
+            elif not self.targeted_scanning() or self.worth_scanning(x_next, y_next):
+                possible_paths.append((cell.check_visited(index), index))
+        if not possible_paths:
+            return None
+        possible_paths.sort()
+
+        # Of the best ranked paths, the next direction is the one the motion costs say is quickest to drive through from the heading
+        # When two are as quick as each other the wall the robot faced on arriving is preferred, then the wall behind it, then the first of the others
+        min_rank = possible_paths[0][0]
+        best = None
+        for rank, direction in possible_paths:
+            if rank != min_rank:
+                break
+            preference = 0 if direction == facing_wall else 1 if direction == (facing_wall + 2) % 4 else 2
+            option = (self.costs.through_wall(heading, direction)[0], preference, direction)
+            if best is None or option < best:
+                best = option
+        return best[2]
+
+    # Corridor cells returns how many cells in a row the tremaux algorithm drives through the wall from (x_pos, y_pos), starting with the one it is about to drive into
+    # A cell with every wall known, or ignored, has nothing to scan, so when the algorithm would carry straight on through it the robot does not stop there
+    # The algorithm's choice in each such cell is worked out as if the robot had stopped, facing the way it would be, and the wall is visited the same way
+    # The drive ends in the first cell that still has walls to scan, that the algorithm would turn in, or where the exploration is finished
+    def corridor_cells(self, x_pos, y_pos, wall, heading):
+        reverse = self.costs.through_wall(heading, wall)[1]
+        facing_wall = (wall + 2) % 4 if reverse else wall
+        cells = 1
+        while True:
+            x_pos += wall_x_offsets[wall]
+            y_pos += wall_y_offsets[wall]
+            # The walls are inferred and the exploration checked for being finished in each cell, the same as the algorithm does when it stops in one
+            self.maze.infer_walls()
+            if self.exploration_finished():
+                return cells
+            if self.relevant is not None and not self.relevant.contains(x_pos, y_pos):
+                return cells
+            cell = self.maze.cells[x_pos][y_pos]
+            wall_states = []
+            for direction in range(4):
+                if cell.wall_known(direction):
+                    wall_states.append(cell.check_wall(direction))
+                elif self.wall_ignored(x_pos, y_pos, direction):
+                    wall_states.append(True)
+                else:
+                    return cells
+            if self.tremaux_direction(cell, wall_states, facing_wall, 90 * facing_wall) != wall:
+                return cells
+            cell.visit_wall(wall)
+            cells += 1
+
+    # Return to relevant cells drives back along walls known to be open to the nearest cell that could be on the route
+    # Each wall driven through is visited as the tremaux algorithm would, so the branch that was left is marked as explored
+    # It returns False without moving if no relevant cell can be reached, or if the robot is already in one, as then there is nowhere left for it to go
+    def return_to_relevant_cells(self):
+        x_pos, y_pos = self.get_current_cell_location()
+        route = self.relevant.path_to_relevant(x_pos, y_pos)
+        if route is None or len(route) < 2:
+            return False
+        for x_next, y_next in route[1:]:
+            wall = wall_between(x_pos, y_pos, x_next, y_next)
+            self.maze.cells[x_pos][y_pos].visit_wall(wall)
+            self.drive_through_wall(wall)
+            x_pos, y_pos = x_next, y_next
+        return True
+
+    # Frontier exploration maps the maze by always driving to whichever cell with walls that are not known it can reach soonest, and scanning there
+    # Unlike the tremaux algorithm it drives straight through corridors that are already known rather than scanning every cell it passes through
+    def frontier_exploration(self):
+        while True:
+            self.maze.infer_walls()
+            if self.exploration_finished():
+                return
+
+            # The current maze interpretation is printed as a progress display, the same as the tremaux algorithm
+            brain.clear()
+            self.maze.print_plain()
+            brain_print_line("Unknown walls: " + str(self.maze.unknown_walls()))
+
+            # When the robot is in a cell with walls that are not known they are scanned straight away
+            x_pos, y_pos = self.get_current_cell_location()
+            if self.worth_scanning(x_pos, y_pos):
+                self.check_junction()
+                continue
+
+            # Until a route through walls known to be open has been found, the robot drives into whichever open neighbour is closest to the end instead
+            if self.heading_for_goal():
+                wall = self.goal_wall(x_pos, y_pos)
+                if wall is not None:
+                    self.drive_through_wall(wall)
+                    continue
+
+            # Otherwise the robot drives to the nearest such cell. Walls facing it along the way are checked as it turns,
+            # so once the target is known the rest of the route is dropped and a new target found
+            route = self.plan_frontier_route()
+            # The walls left unknown can not be reached through the known open walls, so there is nothing more the robot can find out
+            if route is None:
+                return
+            self.drive_frontier_route(route)
+
+    # Drive frontier route drives along a route from plan_frontier_route, stopping once the cell it leads to has every wall known or the time runs out
+    # When visit is True each wall driven through is visited as the tremaux algorithm would
+    def drive_frontier_route(self, route, visit=False):
+        target = route[-1]
+        for x_next, y_next in route[1:]:
+            x_pos, y_pos = self.get_current_cell_location()
+            wall = wall_between(x_pos, y_pos, x_next, y_next)
+            if visit:
+                self.maze.cells[x_pos][y_pos].visit_wall(wall)
+            self.drive_through_wall(wall)
+            self.maze.infer_walls()
+            if self.maze.cells[target[0]][target[1]].fully_known() or self.out_of_time():
+                break
 
 
 # The static map data below sets given values for states of walls in the maze
@@ -846,8 +3049,13 @@ def set_static_map_data(maze):
 
 # The main function is used to start and stop the entire process. It also controls everything in the environment such as setting up the maze, robot and printing the maze when mapping is complete
 def main():
-    # Here we create the maze object, with the size of the maze
-    maze = Maze(8, 8)
+    # Here we create the maze object, with the size of the maze, using the storage chosen at the top of the file
+    if MAZE_STORAGE == 'packed':
+        maze = PackedMaze(8, 8)
+    elif MAZE_STORAGE == 'sparse':
+        maze = SparseMaze(8, 8)
+    else:
+        maze = Maze(8, 8)
 
     # Here we initialize the maze as the method cannot be called in the constructor of the maze itself
     maze.initialize_maze()
@@ -855,22 +3063,62 @@ def main():
     # Static data for the map is set for the maze created above. The amount of static data depends on the use of the COMPETITION_MODE setting
     # by default it will just use the start and end points for every map in the vexcode platform
     set_static_map_data(maze)
+    # When the maze is known to have no loops, walls that would make a loop are inferred without the robot having to look at them
+    if PERFECT_MAZE:
+        maze.assume_perfect_maze()
 
     # The robot is then created using the maze to base itself off of
     robot = Robot(maze)
-    # The robot is then instructed to use the Tremaux algorithm to map the maze
-    robot.tremaux_algorithm()
+    # A time budget needs the route too, so that the robot knows which route it is improving and can tell how good it is when the time runs out
+    known_only = EARLY_FINISH or TIME_BUDGET is not None
+    if known_only:
+        robot.finish_when_route_proven(4, 0, 3, 7)
+    if TIME_BUDGET is not None:
+        robot.set_time_budget(TIME_BUDGET)
+    if PRUNE_REGIONS:
+        robot.prune_regions(4, 0, 3, 7)
+    robot.long_range_scans = LONG_RANGE_SCANS
+    robot.sweep_scans = SWEEP_SCANS
+    robot.smooth_paths = SMOOTH_PATHS
+    # The robot is then instructed to use the Tremaux algorithm to map the maze, or frontier exploration if it is chosen at the top of the file
+    if EXPLORATION == 'frontier':
+        robot.frontier_exploration()
+    else:
+        robot.tremaux_algorithm()
 
     # Once mapping is complete we clear the console then print the maze in a plain format
     brain.clear()
     maze.print_plain()
 
     # The maze then uses a breath first algorithm to generate an optimal path through the internal representation of the maze
-    path = maze.pathfind_breath_first(4, 0, 3, 7)
+    # The path service is asked for it, so with an early finish the table already kept from checking the route during exploration is used
+    # When the fastest planner is chosen the route is instead planned by the robot for the least driving time, starting from the start cell facing north
+    # The junction graph treats walls that are not known as open, so with an early finish the breath first search is used instead
+    if ROUTE_PLANNER == 'fastest':
+        path = robot.plan_fastest_route(4, 0, 3, 7, Walls.North, known_only)
+    elif ROUTE_PLANNER == 'junctions' and not known_only:
+        path = maze.junction_graph([(4, 0), (3, 7)]).find_path(4, 0, 3, 7)
+    else:
+        path = maze.path_service().find_path(4, 0, 3, 7, known_only)
 
     # This path is then displayed on the printout of the maze using '•' as a marker for the path
-    brain.new_line()
-    maze.print_path(path, '•')
+    # If the walls that were found leave no way from the start to the end, this is printed instead
+    if path is None:
+        brain_print_line("No path found")
+    else:
+        brain.new_line()
+        maze.print_path(path, '•')
+        # When exploring stopped before every wall was known, how far from the shortest route the shortest known route could be is printed as well
+        if known_only:
+            brain_print_line("Route could be up to " + str(robot.route_gap()) + " cells longer than the shortest")
+
+    # With a speed run the robot then drives the route it found, and prints how long the drive from the start to the end took
+    if SPEED_RUN and path is not None:
+        run_time = robot.speed_run(path)
+        if run_time is None:
+            brain_print_line("No route known to be open for the speed run")
+        else:
+            brain_print_line("Speed run took " + str(round(run_time, 2)) + " seconds")
 
     # As the maze mapping and printout are complete, we then stop the project
     brain_print_line("Program Complete")
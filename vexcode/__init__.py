@@ -5,20 +5,13 @@
 # platform. It serves to allow easier editing
 # and intellisense support when writing code
 # outside of the VEXCODE platform itself
+#
+# Every function forwards to the active backend
+# in vexcode/backend.py, so a simulator can be
+# installed to run projects off the platform
 # ------------------------------------------
 from typing import NewType
 
-import vexcode.brain as brain 
-import vexcode.distance as distance
-import vexcode.down_eye as down_eye
-import vexcode.drivetrain as drivetrain
-import vexcode.front_eye as front_eye
-import vexcode.left_bumper as left_bumper
-import vexcode.location as location
-import vexcode.magnet as magnet
-import vexcode.pen as pen
-import vexcode.right_bumper as right_bumper
-
 # Functions
 def vr_thread(function):
     """
@@ -101,7 +94,7 @@ def vr_thread(function):
 
     vr_thread(move_drivetrain())
     """
-    return
+    return backend.active.vr_thread(function)
 
 # Looks
 def monitor_variable(*args):
@@ -137,7 +130,7 @@ def monitor_variable(*args):
             
             drivetrain.turn_for(LEFT,180,DEGREES)
     """
-    return
+    return backend.active.monitor_variable(*args)
 
 def monitor_sensor(*args):
     """
@@ -183,7 +176,7 @@ def monitor_sensor(*args):
             drivetrain.drive_for(FORWARD, 200, MM)
             drivetrain.turn_for(RIGHT, 90, DEGREES)
     """
-    return
+    return backend.active.monitor_sensor(*args)
 
 # Control
 def wait(TIME, UNITS):
@@ -203,7 +196,7 @@ def wait(TIME, UNITS):
     drivetrain.stop()
     Note that the parameter in each command is written in capitalized letters.
     """
-    return
+    return backend.active.wait(TIME, UNITS)
 
 def stop_project():
     """
@@ -225,7 +218,7 @@ def stop_project():
         drivetrain.turn_for(RIGHT, 90,DEGREES)
     stop_project()
     """
-    return
+    return backend.active.stop_project()
 
 
 # Constants
@@ -253,6 +246,7 @@ INCHES: Units = 1
 DEGREES: Units = 2
 MSEC: Units = 3
 PERCENT: Units = 4
+SECONDS: Units = 5
 
 # Axis
 Axis = NewType('Axis', int)
@@ -262,4 +256,18 @@ Y: Axis = 1
 # MagnetState
 MagnetState = NewType('MagnetState', int)
 BOOST: MagnetState = 0
-DROP: MagnetState = 1
\ No newline at end of file
+DROP: MagnetState = 1
+
+# Devices
+# These are imported after the constants above as each device module imports the constants it uses from this package
+from vexcode import backend
+import vexcode.brain as brain
+import vexcode.distance as distance
+import vexcode.down_eye as down_eye
+import vexcode.drivetrain as drivetrain
+import vexcode.front_eye as front_eye
+import vexcode.left_bumper as left_bumper
+import vexcode.location as location
+import vexcode.magnet as magnet
+import vexcode.pen as pen
+import vexcode.right_bumper as right_bumper
@@ -0,0 +1,158 @@
+# ------------------------------------------
+# The backend is what every vexcode function
+# forwards its call to. By default it is the
+# skeleton backend below, which returns the
+# same placeholder values the stubs always
+# have. Installing another backend, such as
+# the simulator, gives the functions real
+# behaviour outside of the VEXCODE platform
+# ------------------------------------------
+
+
+# The Backend class holds one method per vexcode function, named after the module and function it serves
+# Subclasses only need to override the methods for the devices they model, everything else keeps the placeholder behaviour
+class Backend:
+    # Functions
+    def vr_thread(self, function):
+        return
+
+    def monitor_variable(self, *args):
+        return
+
+    def monitor_sensor(self, *args):
+        return
+
+    def wait(self, time, units):
+        return
+
+    def stop_project(self):
+        return
+
+    # Brain
+    def brain_print(self, text):
+        return
+
+    def brain_clear(self):
+        return
+
+    def brain_new_line(self):
+        return
+
+    def brain_set_print_color(self, color):
+        return
+
+    def brain_timer_reset(self):
+        return
+
+    def brain_timer_time(self, units):
+        return
+
+    # Distance
+    def distance_found_object(self):
+        return True
+
+    def distance_get_distance(self, units):
+        return 100
+
+    # Down Eye
+    def down_eye_near_object(self):
+        return True
+
+    def down_eye_detect(self, color):
+        return True
+
+    def down_eye_brightness(self, units):
+        return
+
+    # Drivetrain
+    def drivetrain_drive(self, direction):
+        return
+
+    def drivetrain_drive_for(self, direction, distance, units, wait=True):
+        return
+
+    def drivetrain_turn(self, direction):
+        return
+
+    def drivetrain_turn_for(self, direction, angle, units, wait=True):
+        return
+
+    def drivetrain_turn_to_heading(self, angle, units, wait=True):
+        return
+
+    def drivetrain_turn_to_rotation(self, angle, units, wait=True):
+        return
+
+    def drivetrain_stop(self):
+        return
+
+    def drivetrain_set_drive_velocity(self, velocity, units):
+        return
+
+    def drivetrain_set_turn_velocity(self, velocity, units):
+        return
+
+    def drivetrain_set_heading(self, value, units):
+        return
+
+    def drivetrain_set_rotation(self, value, units):
+        return
+
+    def drivetrain_is_done(self):
+        return True
+
+    def drivetrain_is_moving(self):
+        return True
+
+    def drivetrain_heading(self, units):
+        return 33
+
+    def drivetrain_rotation(self, units):
+        return 33
+
+    # Front Eye
+    def front_eye_near_object(self):
+        return True
+
+    def front_eye_detect(self, color):
+        return True
+
+    def front_eye_brightness(self, units):
+        return
+
+    # Bumpers
+    def left_bumper_pressed(self):
+        return True
+
+    def right_bumper_pressed(self):
+        return True
+
+    # Location
+    def location_position(self, axis, units):
+        return 100
+
+    def location_position_angle(self, units):
+        return 3
+
+    # Magnet
+    def magnet_energize(self, state):
+        return
+
+    # Pen
+    def pen_move(self, direction):
+        return
+
+    def pen_set_pen_color(self, color):
+        return
+
+
+# The active backend is looked up on every call so that a new one can be swapped in at any point
+active = Backend()
+
+
+# Install replaces the active backend with the one given and returns the previous one so that it can be restored afterwards
+def install(new_backend):
+    global active
+    previous = active
+    active = new_backend
+    return previous
@@ -1,4 +1,5 @@
 from vexcode import Color
+from vexcode import backend
 
 # Looks
 def print(text):
@@ -19,7 +20,7 @@ def print(text):
     my_variable = "VEX"
     brain.print(my_variable)
     """
-    return
+    return backend.active.brain_print(text)
 
 def clear():
     """
@@ -38,7 +39,7 @@ def clear():
     brain.clear()
     brain.print("Goodbye")
     """
-    return
+    return backend.active.brain_clear()
 
 def new_line():
     """
@@ -56,7 +57,7 @@ def new_line():
     brain.new_line()
     brain.print("Forward")
     """
-    return
+    return backend.active.brain_new_line()
 
 def set_print_color(COLOR: Color):
     """
@@ -79,7 +80,7 @@ def set_print_color(COLOR: Color):
     set_print_color(RED)
     brain.print("STOP!")
     """
-    return
+    return backend.active.brain_set_print_color(COLOR)
 
 # Sensing
 
@@ -104,7 +105,7 @@ def timer_reset():
 
     Notice how the if statement contains a colon at the end - this indicates to Python that a block of statements follows
     """
-    return
+    return backend.active.brain_timer_reset()
 
 def timer_time(SECONDS):
     """
@@ -129,4 +130,4 @@ def timer_time(SECONDS):
 
     Notice how the while statement contains a colon at the end - this indicates to Python that a block of statements follows
     """
-    return
+    return backend.active.brain_timer_time(SECONDS)
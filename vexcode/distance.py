@@ -1,4 +1,5 @@
 from vexcode import Units
+from vexcode import backend
 
 # Sensing
 def found_object():
@@ -26,7 +27,7 @@ def found_object():
 
     brain.print(distance.found_object())
     """
-    return True
+    return backend.active.distance_found_object()
 
 def get_distance(UNITS: Units):
     """
@@ -53,4 +54,4 @@ def get_distance(UNITS: Units):
 
     brain.print(distance.get_distance(INCHES))
     """
-    return 100
\ No newline at end of file
+    return backend.active.distance_get_distance(UNITS)
\ No newline at end of file
@@ -1,4 +1,5 @@
 from vexcode import Color
+from vexcode import backend
 
 
 # Sensing
@@ -34,7 +35,7 @@ def near_object():
 
     Notice how the if/else statement contains a colon at the end of each line - this indicates to Python that a block of statements follows
     """
-    return True
+    return backend.active.down_eye_near_object()
 
 
 def detect(COLOR: Color):
@@ -77,7 +78,7 @@ def detect(COLOR: Color):
 
     Notice how the if/else statement contains a colon at the end of each line - this indicates to Python that a block of statements follows
     """
-    return True
+    return backend.active.down_eye_detect(COLOR)
 
 
 def brightness(PERCENT):
@@ -92,4 +93,4 @@ def brightness(PERCENT):
 
     down_eye.brightness(PERCENT) can be assigned to variables, be used in Boolean expressions, or be used in other commands that take numerical values as a parameter.
     """
-    return
+    return backend.active.down_eye_brightness(PERCENT)
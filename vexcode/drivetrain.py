@@ -1,4 +1,5 @@
 from vexcode import Direction, Units
+from vexcode import backend
 
 # Drivetrain
 def drive(DIRECTION: Direction):
@@ -21,10 +22,10 @@ def drive(DIRECTION: Direction):
     drivetrain.drive(REVERSE)
     Notice that the parameter in each command is written in capitalized letters
     """
-    return
+    return backend.active.drivetrain_drive(DIRECTION)
 
 
-def drive_for(DIRECTION: Direction, DISTANCE, UNITS: Units):
+def drive_for(DIRECTION: Direction, DISTANCE, UNITS: Units, wait=True):
     """
     Drive For
     Moves the Drivetrain for a given distance.
@@ -45,7 +46,7 @@ def drive_for(DIRECTION: Direction, DISTANCE, UNITS: Units):
     drivetrain.drive_for(REVERSE, 150, INCHES)
     Notice the parameter in each command is written in capitalized letters.
     """
-    return
+    return backend.active.drivetrain_drive_for(DIRECTION, DISTANCE, UNITS, wait)
 
 
 def turn(DIRECTION: Direction):
@@ -67,10 +68,10 @@ def turn(DIRECTION: Direction):
     drivetrain.turn(LEFT)
     Notice that the parameter in each command is written in capitalized letters.
     """
-    return
+    return backend.active.drivetrain_turn(DIRECTION)
 
 
-def turn_for(DIRECTION: Direction, ANGLE, UNITS: Units):
+def turn_for(DIRECTION: Direction, ANGLE, UNITS: Units, wait=True):
     """
     Turn For
     Turns the Drivetrain for a given angle.
@@ -90,10 +91,10 @@ def turn_for(DIRECTION: Direction, ANGLE, UNITS: Units):
 
     drivetrain.turn_for(LEFT, 90, DEGREES)
     """
-    return
+    return backend.active.drivetrain_turn_for(DIRECTION, ANGLE, UNITS, wait)
 
 
-def turn_to_heading(ANGLE, UNITS: Units):
+def turn_to_heading(ANGLE, UNITS: Units, wait=True):
     """
     Turn To Heading
     Turns a Drivetrain to a specific heading(angle) using the built in Gyro sensor.
@@ -118,10 +119,10 @@ def turn_to_heading(ANGLE, UNITS: Units):
     drivetrain.turn_to_heading(315, DEGREES)
     Note that the parameter in each command is written in capitalized letters.
     """
-    return
+    return backend.active.drivetrain_turn_to_heading(ANGLE, UNITS, wait)
 
 
-def turn_to_rotation(ANGLE, UNITS: Units):
+def turn_to_rotation(ANGLE, UNITS: Units, wait=True):
     """
     Turn To Rotation
     Turns a Drivetrain to a specific angle of rotation using the built in Gyro sensor.
@@ -144,7 +145,7 @@ def turn_to_rotation(ANGLE, UNITS: Units):
     drivetrain.turn_to_rotation(-45, DEGREES)
     Note the parameter in each command is written in capitalized letters.
     """
-    return
+    return backend.active.drivetrain_turn_to_rotation(ANGLE, UNITS, wait)
 
 
 def stop():
@@ -164,7 +165,7 @@ def stop():
     drivetrain.stop()
     Notice the parameter in each command is written in capitalized letters.
     """
-    return
+    return backend.active.drivetrain_stop()
 
 
 def set_drive_velocity(VELOCITY, PERCENT):
@@ -183,7 +184,7 @@ def set_drive_velocity(VELOCITY, PERCENT):
     drivetrain.drive_for(FORWARD, 200, MM)
     Note the parameter in each command is written in capitalized letters
     """
-    return
+    return backend.active.drivetrain_set_drive_velocity(VELOCITY, PERCENT)
 
 
 def set_turn_velocity(VELOCITY, PERCENT):
@@ -202,7 +203,7 @@ def set_turn_velocity(VELOCITY, PERCENT):
     drivetrain.turn_for(RIGHT, 90, DEGREES)
     Note that the parameter in each command is written in capitalized letters
     """
-    return
+    return backend.active.drivetrain_set_turn_velocity(VELOCITY, PERCENT)
 
 
 def set_heading(VALUE, UNITS: Units):
@@ -216,7 +217,7 @@ def set_heading(VALUE, UNITS: Units):
 
     The drivetrain.set_heading() command accepts a range of 0 to 360 degrees.
     """
-    return
+    return backend.active.drivetrain_set_heading(VALUE, UNITS)
 
 
 def set_rotation(VALUE, UNITS: Units):
@@ -228,7 +229,7 @@ def set_rotation(VALUE, UNITS: Units):
     How To Use
     The drivetrain.set_rotation() command can be used to set the Drivetrain's angle of rotation to any given positive or negative value.
     """
-    return
+    return backend.active.drivetrain_set_rotation(VALUE, UNITS)
 
 # Sensing
 
@@ -244,7 +245,7 @@ def is_done():
 
     drivetrain.is_done() can be assigned to variables, be used in Boolean statements, or be used in other commands that take Boolean values as a parameter.
     """
-    return True
+    return backend.active.drivetrain_is_done()
 
 
 def is_moving():
@@ -271,7 +272,7 @@ def is_moving():
 
     brain.print(drivetrain.is_moving())
     """
-    return True
+    return backend.active.drivetrain_is_moving()
 
 
 def heading(UNITS: Units):
@@ -287,7 +288,7 @@ def heading(UNITS: Units):
 
     drivetrain.heading(DEGREES) can be assigned to variables, be used in Boolean expressions, or be used in other commands that take numerical values as a parameter.
     """
-    return 33
+    return backend.active.drivetrain_heading(UNITS)
 
 
 def rotation(UNITS: Units):
@@ -301,4 +302,4 @@ def rotation(UNITS: Units):
 
     drivetrain.rotation(DEGREES) can be assigned to variables, be used in Boolean expressions, or be used in other commands that take numerical values as a parameter.
     """
-    return 33
+    return backend.active.drivetrain_rotation(UNITS)
@@ -1,4 +1,5 @@
 from vexcode import Axis, Units
+from vexcode import backend
 
 # Sensing
 def position(AXIS: Axis, UNITS: Units):
@@ -27,7 +28,7 @@ def position(AXIS: Axis, UNITS: Units):
         wait(5, MSEC)
     drivetrain.stop()
     """
-    return 100
+    return backend.active.location_position(AXIS, UNITS)
 
 def position_angle(DEGREES):
     """
@@ -41,4 +42,4 @@ def position_angle(DEGREES):
 
     location.position_angle(DEGREES) command can be assigned to variables, be used in Boolean expressions, or be used in other commands that take numerical values as a parameter.
     """
-    return 3
\ No newline at end of file
+    return backend.active.location_position_angle(DEGREES)
\ No newline at end of file
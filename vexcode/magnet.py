@@ -1,5 +1,6 @@
 from enum import Enum
 from vexcode import MagnetState
+from vexcode import backend
 
 # Magnet
 def energize(BOOST: MagnetState):
@@ -21,4 +22,4 @@ def energize(BOOST: MagnetState):
     drivetrain.drive_for(REVERSE, 200, MM, wait=True)
     magnet.energize(DROP)
     """
-    return
\ No newline at end of file
+    return backend.active.magnet_energize(BOOST)
\ No newline at end of file
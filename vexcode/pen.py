@@ -1,4 +1,5 @@
 from vexcode import Color, Direction
+from vexcode import backend
 
 # Looks
 def move(DIRECTION: Direction):
@@ -21,7 +22,7 @@ def move(DIRECTION: Direction):
     pen.set_pen_color(BLACK)
     drivetrain.drive(FORWARD)
     """
-    return
+    return backend.active.pen_move(DIRECTION)
 
 def set_pen_color(COLOR: Color):
     """
@@ -43,4 +44,4 @@ def set_pen_color(COLOR: Color):
     pen.set_pen_color(BLUE)
     drivetrain.drive(FORWARD)
     """
-    return
\ No newline at end of file
+    return backend.active.pen_set_pen_color(COLOR)
\ No newline at end of file
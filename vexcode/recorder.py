@@ -0,0 +1,305 @@
+# ------------------------------------------
+# This module records a run of a project to a
+# compact binary log and replays it again. The
+# recorder wraps another backend, such as the
+# simulator, and logs every drivetrain command
+# and sensor reading that passes through it.
+# The replayer then serves those readings back
+# to the project with no simulator behind it,
+# so the project's own cpu time can be measured
+# with the physics taken out
+#
+# python -m vexcode.simulator "Maze Solving Bot.py" --seed 3 --record run.vxlog
+# python -m vexcode.recorder run.vxlog "Maze Solving Bot.py" --repeat 20 --profile 15
+# ------------------------------------------
+import argparse
+import struct
+
+from vexcode.scheduler import ScheduledBackend, run_script
+
+# Every log starts with this header, the last byte being the version of the format
+LOG_HEADER = b'VXLOG\x01'
+
+# The logged calls are the backend methods that are recorded, with the struct formats of their arguments and of their result
+# A record is the index of the call in this list as a single byte, followed by its packed arguments and then its packed result
+# Directions, units and axes are single bytes, amounts are 32 bit floats, and readings are 64 bit floats so they replay exactly
+LOGGED_CALLS = [
+    # Drivetrain commands
+    ('drivetrain_drive', 'B', ''),
+    ('drivetrain_drive_for', 'BfB?', ''),
+    ('drivetrain_turn', 'B', ''),
+    ('drivetrain_turn_for', 'BfB?', ''),
+    ('drivetrain_turn_to_heading', 'fB?', ''),
+    ('drivetrain_turn_to_rotation', 'fB?', ''),
+    ('drivetrain_stop', '', ''),
+    ('drivetrain_set_drive_velocity', 'fB', ''),
+    ('drivetrain_set_turn_velocity', 'fB', ''),
+    ('drivetrain_set_heading', 'fB', ''),
+    ('drivetrain_set_rotation', 'fB', ''),
+    # Sensor readings
+    ('drivetrain_heading', 'B', 'd'),
+    ('drivetrain_rotation', 'B', 'd'),
+    ('drivetrain_is_done', '', '?'),
+    ('drivetrain_is_moving', '', '?'),
+    ('distance_get_distance', 'B', 'd'),
+    ('distance_found_object', '', '?'),
+    ('location_position', 'BB', 'd'),
+    ('location_position_angle', 'B', 'd'),
+    ('brain_timer_time', 'B', 'd'),
+]
+
+# These lookups are built from the list above, giving the opcode and compiled structs for each logged call by name
+OPCODES = dict((call[0], opcode) for opcode, call in enumerate(LOGGED_CALLS))
+ARGUMENT_STRUCTS = [struct.Struct('<' + call[1]) for call in LOGGED_CALLS]
+RESULT_STRUCTS = [struct.Struct('<' + call[2]) for call in LOGGED_CALLS]
+
+
+# ReplayMismatch is raised when a project being replayed makes a different call to the one that was recorded
+# This means the project has changed its behaviour since the recording, so the rest of the log no longer applies
+class ReplayMismatch(Exception):
+    pass
+
+
+# The recorder passes every call on to the backend it wraps, logging the calls in LOGGED_CALLS as it goes
+class Recorder:
+    def __init__(self, inner):
+        self.inner = inner
+        self.log = bytearray(LOG_HEADER)
+
+    # Any call that is not logged goes straight through to the wrapped backend, as do its properties such as the scheduler
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+    # Record makes the call on the wrapped backend and appends it, with its result, to the log
+    def record(self, name, *arguments):
+        result = getattr(self.inner, name)(*arguments)
+        opcode = OPCODES[name]
+        self.log.append(opcode)
+        self.log += ARGUMENT_STRUCTS[opcode].pack(*arguments)
+        if RESULT_STRUCTS[opcode].size:
+            self.log += RESULT_STRUCTS[opcode].pack(result)
+        return result
+
+    # Save writes the log to a file
+    def save(self, path):
+        with open(path, 'wb') as log_file:
+            log_file.write(self.log)
+
+    # Drivetrain
+    def drivetrain_drive(self, direction):
+        return self.record('drivetrain_drive', direction)
+
+    def drivetrain_drive_for(self, direction, distance, units, wait=True):
+        return self.record('drivetrain_drive_for', direction, distance, units, wait)
+
+    def drivetrain_turn(self, direction):
+        return self.record('drivetrain_turn', direction)
+
+    def drivetrain_turn_for(self, direction, angle, units, wait=True):
+        return self.record('drivetrain_turn_for', direction, angle, units, wait)
+
+    def drivetrain_turn_to_heading(self, angle, units, wait=True):
+        return self.record('drivetrain_turn_to_heading', angle, units, wait)
+
+    def drivetrain_turn_to_rotation(self, angle, units, wait=True):
+        return self.record('drivetrain_turn_to_rotation', angle, units, wait)
+
+    def drivetrain_stop(self):
+        return self.record('drivetrain_stop')
+
+    def drivetrain_set_drive_velocity(self, velocity, units):
+        return self.record('drivetrain_set_drive_velocity', velocity, units)
+
+    def drivetrain_set_turn_velocity(self, velocity, units):
+        return self.record('drivetrain_set_turn_velocity', velocity, units)
+
+    def drivetrain_set_heading(self, value, units):
+        return self.record('drivetrain_set_heading', value, units)
+
+    def drivetrain_set_rotation(self, value, units):
+        return self.record('drivetrain_set_rotation', value, units)
+
+    def drivetrain_heading(self, units):
+        return self.record('drivetrain_heading', units)
+
+    def drivetrain_rotation(self, units):
+        return self.record('drivetrain_rotation', units)
+
+    def drivetrain_is_done(self):
+        return self.record('drivetrain_is_done')
+
+    def drivetrain_is_moving(self):
+        return self.record('drivetrain_is_moving')
+
+    # Distance
+    def distance_get_distance(self, units):
+        return self.record('distance_get_distance', units)
+
+    def distance_found_object(self):
+        return self.record('distance_found_object')
+
+    # Location
+    def location_position(self, axis, units):
+        return self.record('location_position', axis, units)
+
+    def location_position_angle(self, units):
+        return self.record('location_position_angle', units)
+
+    # Brain
+    def brain_timer_time(self, units):
+        return self.record('brain_timer_time', units)
+
+
+# The replayer serves the results in a log back to a project in the order they were recorded
+# Drivetrain commands are checked against the log but take no time, so replaying only costs the project's own cpu time
+# Only the order of calls is replayed, so projects with more than one vr_thread should be recorded and replayed with a single thread
+class Replayer(ScheduledBackend):
+    def __init__(self, log, strict=True):
+        ScheduledBackend.__init__(self)
+        if bytes(log[:len(LOG_HEADER)]) != LOG_HEADER:
+            raise ValueError('not a vexcode log, or a log from a different version')
+
+        # The log is decoded up front into (opcode, packed arguments, result) records so that replaying a call is just a list lookup
+        self.records = []
+        position = len(LOG_HEADER)
+        while position < len(log):
+            opcode = log[position]
+            position += 1
+            argument_size = ARGUMENT_STRUCTS[opcode].size
+            packed_arguments = bytes(log[position:position + argument_size])
+            position += argument_size
+            result = None
+            if RESULT_STRUCTS[opcode].size:
+                result = RESULT_STRUCTS[opcode].unpack_from(log, position)[0]
+                position += RESULT_STRUCTS[opcode].size
+            self.records.append((opcode, packed_arguments, result))
+
+        # When strict is True the arguments of every call are checked as well as which call it is
+        self.strict = strict
+        self.position = 0
+
+    # Load reads a log from a file
+    @staticmethod
+    def load(path, strict=True):
+        with open(path, 'rb') as log_file:
+            return Replayer(log_file.read(), strict)
+
+    # Rewind starts the log again from the beginning, so the same replayer can be used for repeated runs
+    def rewind(self):
+        self.position = 0
+        self.scheduler = type(self.scheduler)()
+        self.timer_start = 0.0
+
+    # Replay checks the call against the next record in the log and returns the result that was recorded for it
+    def replay(self, name, *arguments):
+        if self.position >= len(self.records):
+            raise ReplayMismatch('%s was called after the end of the log' % name)
+        opcode, packed_arguments, result = self.records[self.position]
+        if opcode != OPCODES[name]:
+            raise ReplayMismatch('call %d was %s but %s was recorded' % (self.position, name, LOGGED_CALLS[opcode][0]))
+        if self.strict and packed_arguments != ARGUMENT_STRUCTS[opcode].pack(*arguments):
+            raise ReplayMismatch('call %d to %s had different arguments to the recording' % (self.position, name))
+        self.position += 1
+        return result
+
+    # Drivetrain
+    def drivetrain_drive(self, direction):
+        return self.replay('drivetrain_drive', direction)
+
+    def drivetrain_drive_for(self, direction, distance, units, wait=True):
+        return self.replay('drivetrain_drive_for', direction, distance, units, wait)
+
+    def drivetrain_turn(self, direction):
+        return self.replay('drivetrain_turn', direction)
+
+    def drivetrain_turn_for(self, direction, angle, units, wait=True):
+        return self.replay('drivetrain_turn_for', direction, angle, units, wait)
+
+    def drivetrain_turn_to_heading(self, angle, units, wait=True):
+        return self.replay('drivetrain_turn_to_heading', angle, units, wait)
+
+    def drivetrain_turn_to_rotation(self, angle, units, wait=True):
+        return self.replay('drivetrain_turn_to_rotation', angle, units, wait)
+
+    def drivetrain_stop(self):
+        return self.replay('drivetrain_stop')
+
+    def drivetrain_set_drive_velocity(self, velocity, units):
+        return self.replay('drivetrain_set_drive_velocity', velocity, units)
+
+    def drivetrain_set_turn_velocity(self, velocity, units):
+        return self.replay('drivetrain_set_turn_velocity', velocity, units)
+
+    def drivetrain_set_heading(self, value, units):
+        return self.replay('drivetrain_set_heading', value, units)
+
+    def drivetrain_set_rotation(self, value, units):
+        return self.replay('drivetrain_set_rotation', value, units)
+
+    def drivetrain_heading(self, units):
+        return self.replay('drivetrain_heading', units)
+
+    def drivetrain_rotation(self, units):
+        return self.replay('drivetrain_rotation', units)
+
+    def drivetrain_is_done(self):
+        return self.replay('drivetrain_is_done')
+
+    def drivetrain_is_moving(self):
+        return self.replay('drivetrain_is_moving')
+
+    # Distance
+    def distance_get_distance(self, units):
+        return self.replay('distance_get_distance', units)
+
+    def distance_found_object(self):
+        return self.replay('distance_found_object')
+
+    # Location
+    # Positions in mm are whole numbers on the platform, so they are given back as integers as they were recorded
+    def location_position(self, axis, units):
+        position = self.replay('location_position', axis, units)
+        return int(position) if position.is_integer() else position
+
+    def location_position_angle(self, units):
+        return self.replay('location_position_angle', units)
+
+    # Brain
+    def brain_timer_time(self, units):
+        return self.replay('brain_timer_time', units)
+
+
+# The command line interface replays a log against a project, optionally several times, and prints the cpu time it took
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description='Replay a recorded vexcode log against a project to measure its cpu time.')
+    parser.add_argument('log', help='the log recorded with python -m vexcode.simulator --record')
+    parser.add_argument('script', help='the project file to replay')
+    parser.add_argument('--repeat', type=int, default=1, help='how many times to replay the log')
+    parser.add_argument('--loose', action='store_true', help='only check which calls are made, not their arguments')
+    parser.add_argument('--profile', type=int, default=0, metavar='N', help='profile the replays and print the N most expensive functions')
+    options = parser.parse_args(arguments)
+
+    replayer = Replayer.load(options.log, not options.loose)
+    profiler = None
+    if options.profile:
+        import cProfile
+        profiler = cProfile.Profile()
+
+    cpu_times = []
+    for repeat in range(options.repeat):
+        replayer.rewind()
+        run_script(options.script, replayer, profiler)
+        cpu_times.append(replayer.cpu_seconds)
+        if replayer.position != len(replayer.records):
+            print('Warning: only %d of %d logged calls were replayed' % (replayer.position, len(replayer.records)))
+
+    print('Logged calls: %d' % len(replayer.records))
+    print('Replays: %d' % len(cpu_times))
+    print('CPU time: best %.4f s, mean %.4f s' % (min(cpu_times), sum(cpu_times) / len(cpu_times)))
+    if profiler is not None:
+        import pstats
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(options.profile)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,5 @@
+from vexcode import backend
+
 # Sensing
 def pressed():
     """
@@ -24,4 +26,4 @@ def pressed():
 
     Notice how the if/else statement contains a colon at the end of each line - this indicates to Python that a block of statements follows
     """
-    return True
+    return backend.active.right_bumper_pressed()
@@ -0,0 +1,226 @@
+# ------------------------------------------
+# This is a discrete event scheduler for the
+# vexcode module. Functions passed to vr_thread
+# run as cooperative tasks on a virtual clock,
+# switching only when one of them waits, the
+# same way they do on the VEXCODE VR platform.
+# Waiting never sleeps for real, the clock just
+# jumps to the next task that is due to run, so
+# projects run much faster than real time and
+# always switch between tasks in the same order
+# ------------------------------------------
+import ast
+import heapq
+import threading
+import time
+
+from vexcode import backend
+from vexcode import MSEC
+
+
+# ProjectStopped is raised by stop_project so that the running project unwinds the same way it would on the platform
+# It derives from BaseException so that a project catching Exception can not accidentally swallow it
+class ProjectStopped(BaseException):
+    pass
+
+
+# A task is one function passed to vr_thread. Each task is given its own thread, but the scheduler only ever lets one of them run at a time
+class Task:
+    def __init__(self, scheduler, function):
+        self.scheduler = scheduler
+        self.function = function
+        self.resume = threading.Event()
+        self.done = False
+        self.error = None
+        self.thread = threading.Thread(target=self.body, daemon=True)
+
+    # The body waits to be resumed for the first time before running the function, and hands control back to the scheduler when it ends
+    # A profiler only profiles the thread it is enabled on, so the scheduler's profiler is enabled inside the task itself
+    def body(self):
+        self.resume.wait()
+        self.resume.clear()
+        profiler = self.scheduler.profiler
+        if profiler is not None:
+            profiler.enable()
+        try:
+            if not self.scheduler.stopped:
+                self.function()
+        except ProjectStopped as stopped:
+            self.scheduler.stop(str(stopped))
+        except BaseException as error:
+            self.error = error
+            self.scheduler.stop('%s in a vr_thread' % type(error).__name__)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            self.done = True
+            self.scheduler.yielded.set()
+
+
+# The scheduler owns the virtual clock and the queue of tasks waiting to run at a given time
+class Scheduler:
+    def __init__(self, time_limit=None):
+        # Time is the current virtual time in seconds, and the time limit stops runaway projects once it is passed
+        self.time = 0.0
+        self.time_limit = time_limit
+
+        # The queue holds (wake time, sequence number, task) entries, the sequence number makes tasks due at the same time run in the order they waited
+        self.queue = []
+        self.sequence = 0
+        self.current = None
+        self.yielded = threading.Event()
+
+        self.stopped = False
+        self.stop_reason = None
+
+        # A cProfile profiler can be given to profile the tasks as they run
+        self.profiler = None
+
+    # This method returns the current virtual time in seconds
+    def now(self):
+        return self.time
+
+    # Spawn adds a new task for the function, which will start running at the current virtual time
+    def spawn(self, function):
+        task = Task(self, function)
+        task.thread.start()
+        self.push(self.time, task)
+        return task
+
+    # Push queues a task to be resumed at the given virtual time
+    def push(self, wake_time, task):
+        heapq.heappush(self.queue, (wake_time, self.sequence, task))
+        self.sequence += 1
+
+    # Sleep moves the calling task forward by the given number of seconds, letting any other task that is due in the meantime run first
+    def sleep(self, seconds):
+        task = self.current
+        wake_time = self.time + max(0.0, seconds)
+        self.check_time_limit(wake_time)
+
+        # When no other task could run before this one wakes up there is nothing to switch to, so the clock just jumps forward
+        # This is also the case for code at the top level of a project, which does not run inside of a task
+        if task is None or not self.queue or self.queue[0][0] > wake_time:
+            self.time = wake_time
+            return
+
+        self.push(wake_time, task)
+        self.yielded.set()
+        task.resume.wait()
+        task.resume.clear()
+        # A task woken up after the project was stopped unwinds instead of carrying on
+        if self.stopped:
+            raise ProjectStopped(self.stop_reason)
+
+    # This method stops the project once the virtual clock would pass the time limit
+    def check_time_limit(self, wake_time):
+        if self.time_limit is not None and wake_time > self.time_limit:
+            self.stop('time limit of %s seconds reached' % self.time_limit)
+            raise ProjectStopped(self.stop_reason)
+
+    # Stop marks the project as stopped, the first reason given is the one that is kept
+    def stop(self, reason):
+        if not self.stopped:
+            self.stopped = True
+            self.stop_reason = reason
+
+    # Run resumes the queued tasks in order of their wake time until they have all finished or the project is stopped
+    def run(self):
+        while self.queue and not self.stopped:
+            wake_time, sequence, task = heapq.heappop(self.queue)
+            self.time = max(self.time, wake_time)
+            self.switch_to(task)
+            if task.error is not None:
+                self.unwind()
+                raise task.error
+
+        # Any task still waiting when the project stops is resumed one last time so that its thread can unwind
+        self.unwind()
+
+    # Switch to hands control to the task and waits until it either waits again or finishes
+    def switch_to(self, task):
+        self.current = task
+        self.yielded.clear()
+        task.resume.set()
+        self.yielded.wait()
+        self.current = None
+
+    # Unwind lets every queued task finish after the project has stopped
+    def unwind(self):
+        if self.queue:
+            self.stop(self.stop_reason or 'project stopped')
+        while self.queue:
+            wake_time, sequence, task = heapq.heappop(self.queue)
+            self.switch_to(task)
+            task.thread.join()
+
+
+# The scheduled backend gives vr_thread, wait, stop_project and the brain's timer their platform behaviour using a scheduler
+# Other backends, such as the simulator, build on top of it so that their movements take up virtual time
+class ScheduledBackend(backend.Backend):
+    def __init__(self, scheduler=None, time_limit=None):
+        self.scheduler = scheduler if scheduler is not None else Scheduler(time_limit)
+        self.timer_start = 0.0
+
+    # Functions
+    def vr_thread(self, function):
+        # The platform calls the function given to vr_thread itself, so a project run directly will already have called it by now
+        # Only functions that have not been called yet, such as those passed by run_script, are started as tasks
+        if callable(function):
+            self.scheduler.spawn(function)
+
+    def wait(self, time, units):
+        self.scheduler.sleep(time / 1000 if units == MSEC else time)
+
+    def stop_project(self):
+        self.scheduler.stop('stop_project was called')
+        raise ProjectStopped(self.scheduler.stop_reason)
+
+    # Brain
+    def brain_timer_reset(self):
+        self.timer_start = self.scheduler.now()
+
+    def brain_timer_time(self, units):
+        seconds = self.scheduler.now() - self.timer_start
+        return seconds * 1000 if units == MSEC else seconds
+
+
+# On the platform vr_thread(main()) starts main as a thread rather than calling it straight away
+# This transformer gives a project the same behaviour off the platform, by rewriting those calls at the top level of a project into vr_thread(main)
+class ThreadCallRewriter(ast.NodeTransformer):
+    def visit_Module(self, node):
+        for statement in node.body:
+            if not (isinstance(statement, ast.Expr) and isinstance(statement.value, ast.Call)):
+                continue
+            call = statement.value
+            if not (isinstance(call.func, ast.Name) and call.func.id == 'vr_thread' and len(call.args) == 1):
+                continue
+            argument = call.args[0]
+            if isinstance(argument, ast.Call) and not argument.args and not argument.keywords:
+                call.args[0] = argument.func
+        return node
+
+
+# Run script runs a project file with the given scheduled backend installed, then restores the previous backend
+# The project's vr_threads are run as tasks on the backend's scheduler, and the cpu time they used is stored on the backend
+# When a cProfile profiler is given it profiles both the top level of the project and its vr_threads
+def run_script(path, scheduled_backend, profiler=None):
+    with open(path, encoding='utf-8') as script_file:
+        tree = ThreadCallRewriter().visit(ast.parse(script_file.read(), path))
+    code = compile(tree, path, 'exec')
+
+    previous = backend.install(scheduled_backend)
+    scheduled_backend.scheduler.profiler = profiler
+    cpu_start = time.process_time()
+    try:
+        if profiler is not None:
+            profiler.runctx(code, {'__name__': '__main__', '__file__': path}, None)
+        else:
+            exec(code, {'__name__': '__main__', '__file__': path})
+        scheduled_backend.scheduler.run()
+    except ProjectStopped as stopped:
+        scheduled_backend.scheduler.stop(str(stopped))
+    finally:
+        scheduled_backend.cpu_seconds = time.process_time() - cpu_start
+        backend.install(previous)
+    return scheduled_backend
@@ -0,0 +1,529 @@
+# ------------------------------------------
+# This is a headless kinematic simulator for
+# the vexcode module. It loads a ground truth
+# wall maze, models the drivetrain, distance
+# sensor and location sensor against it, and
+# keeps track of the simulated mission time so
+# that projects can be measured off platform
+#
+# python -m vexcode.simulator "Maze Solving Bot.py" --generate 8x8 --seed 3
+# ------------------------------------------
+import argparse
+import math
+import random
+import sys
+
+from vexcode import REVERSE, LEFT, INCHES, X
+from vexcode.scheduler import ScheduledBackend, run_script
+
+MM_PER_INCH = 25.4
+
+# The walls are numbered the same way as the Walls enum in the robot project, so that values can be passed straight between them
+NORTH = 0
+EAST = 1
+SOUTH = 2
+WEST = 3
+
+
+# The wall maze is the ground truth that the simulated robot drives around in
+# Only the north and east wall of every cell is stored, the south and west walls are read from the neighbouring cell
+# The outside of the maze always has walls, as the arena it sits in does
+class WallMaze:
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+
+        # Every wall starts present, generating or loading a maze then removes the walls that are open
+        self.north_walls = [[True] * height for x_pos in range(width)]
+        self.east_walls = [[True] * height for x_pos in range(width)]
+
+    # This method returns if the given wall of the cell at (x_pos, y_pos) is present
+    def has_wall(self, x_pos, y_pos, wall):
+        if wall == NORTH:
+            return y_pos + 1 >= self.height or self.north_walls[x_pos][y_pos]
+        if wall == EAST:
+            return x_pos + 1 >= self.width or self.east_walls[x_pos][y_pos]
+        if wall == SOUTH:
+            return y_pos - 1 < 0 or self.north_walls[x_pos][y_pos - 1]
+        if wall == WEST:
+            return x_pos - 1 < 0 or self.east_walls[x_pos - 1][y_pos]
+
+    # This method sets the given wall of the cell at (x_pos, y_pos), the outside walls of the maze can not be removed
+    def set_wall(self, x_pos, y_pos, wall, state):
+        if wall == NORTH and y_pos + 1 < self.height:
+            self.north_walls[x_pos][y_pos] = state
+        if wall == EAST and x_pos + 1 < self.width:
+            self.east_walls[x_pos][y_pos] = state
+        if wall == SOUTH and y_pos - 1 >= 0:
+            self.north_walls[x_pos][y_pos - 1] = state
+        if wall == WEST and x_pos - 1 >= 0:
+            self.east_walls[x_pos - 1][y_pos] = state
+
+    # Ray distance walks a ray through the grid of cells and returns how far it travels before hitting a wall
+    # The ray starts at (x_pos, y_pos) in maze units, where one unit is one cell, and moves along the (x_step, y_step) unit vector
+    def ray_distance(self, x_pos, y_pos, x_step, y_step):
+        x_cell = int(math.floor(x_pos))
+        y_cell = int(math.floor(y_pos))
+        # A ray starting outside of the maze is already touching the arena wall
+        if not (0 <= x_cell < self.width and 0 <= y_cell < self.height):
+            return 0.0
+
+        # These values are how far along the ray the next vertical and horizontal grid lines are, and how far apart they are
+        if x_step > 0:
+            x_next = (x_cell + 1 - x_pos) / x_step
+        elif x_step < 0:
+            x_next = (x_cell - x_pos) / x_step
+        else:
+            x_next = math.inf
+        if y_step > 0:
+            y_next = (y_cell + 1 - y_pos) / y_step
+        elif y_step < 0:
+            y_next = (y_cell - y_pos) / y_step
+        else:
+            y_next = math.inf
+        x_delta = abs(1 / x_step) if x_step != 0 else math.inf
+        y_delta = abs(1 / y_step) if y_step != 0 else math.inf
+
+        # The ray then crosses whichever grid line is closest until it crosses one with a wall on it
+        # As the outside of the maze always has walls this is guaranteed to finish
+        while True:
+            if x_next < y_next:
+                wall = EAST if x_step > 0 else WEST
+                if self.has_wall(x_cell, y_cell, wall):
+                    return x_next
+                x_cell += 1 if x_step > 0 else -1
+                x_next += x_delta
+            else:
+                wall = NORTH if y_step > 0 else SOUTH
+                if self.has_wall(x_cell, y_cell, wall):
+                    return y_next
+                y_cell += 1 if y_step > 0 else -1
+                y_next += y_delta
+
+    # To text returns the maze drawn with +, - and | characters, the format that from_text reads back in
+    def to_text(self):
+        lines = []
+        for y_pos in reversed(range(self.height)):
+            top = '+'
+            middle = '|'
+            for x_pos in range(self.width):
+                top += ('---' if self.has_wall(x_pos, y_pos, NORTH) else '   ') + '+'
+                middle += '   ' + ('|' if self.has_wall(x_pos, y_pos, EAST) else ' ')
+            lines.append(top)
+            lines.append(middle)
+        lines.append('+' + '---+' * self.width)
+        return '\n'.join(lines)
+
+    # From text creates a maze from the drawing returned by to_text, the first line of the drawing is the north side of the maze
+    @staticmethod
+    def from_text(text):
+        lines = [line for line in text.splitlines() if line.strip()]
+        width = (len(lines[0].rstrip()) - 1) // 4
+        height = (len(lines) - 1) // 2
+        maze = WallMaze(width, height)
+        for row in range(height):
+            y_pos = height - 1 - row
+            top = lines[2 * row].ljust(4 * width + 1)
+            middle = lines[2 * row + 1].ljust(4 * width + 1)
+            for x_pos in range(width):
+                maze.set_wall(x_pos, y_pos, NORTH, top[4 * x_pos + 2] == '-')
+                maze.set_wall(x_pos, y_pos, EAST, middle[4 * x_pos + 4] == '|')
+        return maze
+
+    # Load reads a maze drawing from a file
+    @staticmethod
+    def load(path):
+        with open(path) as maze_file:
+            return WallMaze.from_text(maze_file.read())
+
+    # Generate creates a random perfect maze using a depth first search, the same seed always generates the same maze
+    # The loops parameter is the fraction of the remaining inside walls that are then removed, which adds loops to the maze
+    @staticmethod
+    def generate(width, height, seed=None, loops=0.0):
+        generator = random.Random(seed)
+        maze = WallMaze(width, height)
+
+        visited = [[False] * height for x_pos in range(width)]
+        visited[0][0] = True
+        stack = [(0, 0)]
+        while stack:
+            x_pos, y_pos = stack[-1]
+            options = []
+            for wall, x_next, y_next in ((NORTH, x_pos, y_pos + 1), (EAST, x_pos + 1, y_pos), (SOUTH, x_pos, y_pos - 1), (WEST, x_pos - 1, y_pos)):
+                if 0 <= x_next < width and 0 <= y_next < height and not visited[x_next][y_next]:
+                    options.append((wall, x_next, y_next))
+            if not options:
+                stack.pop()
+                continue
+            wall, x_next, y_next = generator.choice(options)
+            maze.set_wall(x_pos, y_pos, wall, False)
+            visited[x_next][y_next] = True
+            stack.append((x_next, y_next))
+
+        if loops > 0:
+            inside_walls = []
+            for x_pos in range(width):
+                for y_pos in range(height):
+                    if y_pos + 1 < height and maze.north_walls[x_pos][y_pos]:
+                        inside_walls.append((x_pos, y_pos, NORTH))
+                    if x_pos + 1 < width and maze.east_walls[x_pos][y_pos]:
+                        inside_walls.append((x_pos, y_pos, EAST))
+            for x_pos, y_pos, wall in generator.sample(inside_walls, int(len(inside_walls) * loops)):
+                maze.set_wall(x_pos, y_pos, wall, False)
+        return maze
+
+
+# The simulator is a backend which moves a robot around a wall maze instead of returning placeholder values
+# Headings follow the platform, 0 degrees faces north (+Y) and headings increase clockwise so that 90 degrees faces east (+X)
+# Movements take up time on the scheduler's virtual clock, and the robot's pose is brought up to date with the clock whenever it is read
+class Simulator(ScheduledBackend):
+    def __init__(self, maze, cell_length=250, start_cell=(4, 0), start_heading=0, drive_speed=200, turn_speed=75,
+                 sensor_offset=60, body_length=200, sensor_range=3000, origin=None, time_limit=None, echo=False, scheduler=None):
+        ScheduledBackend.__init__(self, scheduler, time_limit)
+        self.maze = maze
+        self.cell_length = cell_length
+
+        # The speeds are in mm and degrees per second with the velocity set to 100%, the platform defaults to a velocity of 50%
+        self.drive_speed = drive_speed
+        self.turn_speed = turn_speed
+        self.drive_velocity = 50
+        self.turn_velocity = 50
+
+        # The distance sensor sits sensor_offset mm in front of the robot's center, and the front of the robot body is half of body_length from it
+        self.sensor_offset = sensor_offset
+        self.body_length = body_length
+        self.sensor_range = sensor_range
+
+        # The origin is the field position of the bottom left corner of the maze, which by default centers the maze on the field
+        if origin is None:
+            origin = (-maze.width * cell_length / 2, -maze.height * cell_length / 2)
+        self.origin = origin
+
+        # The robot starts in the middle of the start cell, positions are kept relative to the bottom left corner of the maze in mm
+        self.x_position = (start_cell[0] + 0.5) * cell_length
+        self.y_position = (start_cell[1] + 0.5) * cell_length
+        self.heading = start_heading % 360
+        self.rotation = 0.0
+
+        # The motion is what the drivetrain is currently doing, as a (kind, rate, amount remaining, final heading and rotation) tuple
+        # The amount remaining is None when the drivetrain has been told to drive or turn forever
+        self.motion = None
+        self.last_update = self.scheduler.now()
+
+        # These counters keep track of the work the robot has done so that different projects can be compared
+        self.drive_count = 0
+        self.turn_count = 0
+        self.distance_reads = 0
+        self.total_driven = 0.0
+        self.total_turned = 0.0
+        self.collisions = 0
+
+        # The console stores what the project prints, one string per line, and echo also prints it as it happens
+        self.console = ['']
+        self.echo = echo
+
+    # Elapsed is the simulated mission time in seconds
+    @property
+    def elapsed(self):
+        return self.scheduler.now()
+
+    # This method converts a distance in the given units into mm
+    @staticmethod
+    def to_mm(value, units):
+        return value * MM_PER_INCH if units == INCHES else value
+
+    # This method converts a distance in mm into the given units
+    @staticmethod
+    def from_mm(value, units):
+        return value / MM_PER_INCH if units == INCHES else value
+
+    # The unit vector that the robot is facing along, in field axes
+    def facing_vector(self):
+        radians = math.radians(self.heading)
+        return math.sin(radians), math.cos(radians)
+
+    # This method returns how far the robot can drive along its heading before its body touches a wall
+    # A negative direction checks the space behind the robot for reversing
+    def free_distance(self, direction):
+        x_step, y_step = self.facing_vector()
+        x_step *= direction
+        y_step *= direction
+        wall_distance = self.maze.ray_distance(self.x_position / self.cell_length, self.y_position / self.cell_length, x_step, y_step)
+        return max(0.0, wall_distance * self.cell_length - self.body_length / 2)
+
+    # Update carries on the current motion up to the scheduler's time, and is called before the robot's state is read or changed
+    def update(self):
+        seconds = self.scheduler.now() - self.last_update
+        self.last_update = self.scheduler.now()
+        if self.motion is None or seconds <= 0:
+            return
+
+        kind, rate, remaining, final_angles = self.motion
+        amount = abs(rate) * seconds
+        # A motion with an amount remaining finishes exactly on that amount, so that rounding does not leave the robot slightly off
+        finished = remaining is not None and amount >= remaining - 1e-9
+        if finished:
+            amount = remaining
+        else:
+            remaining = remaining - amount if remaining is not None else None
+        signed_amount = amount if rate >= 0 else -amount
+
+        if kind == 'drive':
+            self.move(signed_amount)
+        else:
+            self.rotate(signed_amount)
+            if finished:
+                self.heading, self.rotation = final_angles
+
+        self.motion = None if finished else (kind, rate, remaining, final_angles)
+
+    # Move drives the robot the given distance in mm along its heading, stopping early if it would drive into a wall
+    def move(self, distance):
+        direction = 1 if distance >= 0 else -1
+        free = self.free_distance(direction)
+        travelled = min(abs(distance), free)
+        if travelled < abs(distance):
+            self.collisions += 1
+        x_step, y_step = self.facing_vector()
+        self.x_position += x_step * travelled * direction
+        self.y_position += y_step * travelled * direction
+        self.total_driven += travelled
+
+    # Rotate turns the robot the given number of degrees, with positive values turning clockwise
+    def rotate(self, angle):
+        self.heading = (self.heading + angle) % 360
+        self.rotation += angle
+        self.total_turned += abs(angle)
+
+    # These methods return the current drive and turn speeds, taking the velocity percentages into account
+    def current_drive_speed(self):
+        return self.drive_speed * self.drive_velocity / 100
+
+    def current_turn_speed(self):
+        return self.turn_speed * self.turn_velocity / 100
+
+    # Start motion replaces whatever the drivetrain was doing with a new motion
+    # When wait is True the calling task then waits until the motion has finished, as the platform's blocking commands do
+    def start_motion(self, kind, rate, amount=None, final_angles=None, wait=True):
+        self.update()
+        if kind == 'drive':
+            self.drive_count += 1
+        else:
+            self.turn_count += 1
+        if amount is not None and amount <= 0:
+            self.motion = None
+            if final_angles is not None:
+                self.heading, self.rotation = final_angles
+            return
+        self.motion = (kind, rate, amount, final_angles)
+        if wait and amount is not None:
+            self.scheduler.sleep(amount / abs(rate))
+            self.update()
+
+    # These methods start a drive or turn of a given signed amount, which is how all of the blocking drivetrain commands are made up
+    # A turn knows the heading and rotation it will finish on from the start, the final heading can be given so that it finishes exactly on a requested heading
+    def drive_distance(self, distance, wait=True):
+        speed = self.current_drive_speed()
+        self.start_motion('drive', speed if distance >= 0 else -speed, abs(distance), wait=wait)
+
+    def turn_angle(self, angle, final_heading=None, wait=True):
+        self.update()
+        speed = self.current_turn_speed()
+        if final_heading is None:
+            final_heading = (self.heading + angle) % 360
+        final_angles = (final_heading, self.rotation + angle)
+        self.start_motion('turn', speed if angle >= 0 else -speed, abs(angle), final_angles, wait)
+
+    # Report returns a summary of the mission so far
+    def report(self):
+        return {
+            'mission_seconds': self.elapsed,
+            'drives': self.drive_count,
+            'turns': self.turn_count,
+            'distance_reads': self.distance_reads,
+            'mm_driven': self.total_driven,
+            'degrees_turned': self.total_turned,
+            'collisions': self.collisions,
+        }
+
+    # Brain
+    def brain_print(self, text):
+        self.console[-1] += str(text)
+        if self.echo:
+            sys.stdout.write(str(text))
+
+    def brain_clear(self):
+        self.console = ['']
+
+    def brain_new_line(self):
+        self.console.append('')
+        if self.echo:
+            sys.stdout.write('\n')
+
+    # Distance
+    # The distance sensor casts a ray from the front of the robot along its heading
+    def sensor_distance(self):
+        self.update()
+        x_step, y_step = self.facing_vector()
+        x_sensor = self.x_position + x_step * self.sensor_offset
+        y_sensor = self.y_position + y_step * self.sensor_offset
+        wall_distance = self.maze.ray_distance(x_sensor / self.cell_length, y_sensor / self.cell_length, x_step, y_step)
+        return min(wall_distance * self.cell_length, self.sensor_range)
+
+    def distance_found_object(self):
+        return self.sensor_distance() < self.sensor_range
+
+    def distance_get_distance(self, units):
+        self.distance_reads += 1
+        return self.from_mm(self.sensor_distance(), units)
+
+    # Drivetrain
+    def drivetrain_drive(self, direction):
+        speed = self.current_drive_speed()
+        self.start_motion('drive', -speed if direction == REVERSE else speed)
+
+    def drivetrain_drive_for(self, direction, distance, units, wait=True):
+        sign = -1 if direction == REVERSE else 1
+        self.drive_distance(sign * self.to_mm(distance, units), wait)
+
+    def drivetrain_turn(self, direction):
+        speed = self.current_turn_speed()
+        self.start_motion('turn', -speed if direction == LEFT else speed)
+
+    def drivetrain_turn_for(self, direction, angle, units, wait=True):
+        sign = -1 if direction == LEFT else 1
+        self.turn_angle(sign * angle, wait=wait)
+
+    def drivetrain_turn_to_heading(self, angle, units, wait=True):
+        # The shortest way around to the heading is taken, as the platform does
+        self.update()
+        self.turn_angle((angle - self.heading + 180) % 360 - 180, angle % 360, wait)
+
+    def drivetrain_turn_to_rotation(self, angle, units, wait=True):
+        self.update()
+        self.turn_angle(angle - self.rotation, wait=wait)
+
+    def drivetrain_stop(self):
+        self.update()
+        self.motion = None
+
+    def drivetrain_set_drive_velocity(self, velocity, units):
+        self.drive_velocity = velocity
+
+    def drivetrain_set_turn_velocity(self, velocity, units):
+        self.turn_velocity = velocity
+
+    # Setting the heading or rotation switches tasks on the platform, so the calling task waits for no time to let others run
+    def drivetrain_set_heading(self, value, units):
+        self.update()
+        self.heading = value % 360
+        self.scheduler.sleep(0)
+
+    def drivetrain_set_rotation(self, value, units):
+        self.update()
+        self.rotation = value
+        self.scheduler.sleep(0)
+
+    def drivetrain_is_done(self):
+        self.update()
+        return self.motion is None
+
+    def drivetrain_is_moving(self):
+        self.update()
+        return self.motion is not None
+
+    def drivetrain_heading(self, units):
+        self.update()
+        return self.heading
+
+    def drivetrain_rotation(self, units):
+        self.update()
+        return self.rotation
+
+    # Bumpers
+    # A bumper is pressed when the front of the robot is against a wall
+    def left_bumper_pressed(self):
+        self.update()
+        return self.free_distance(1) < 1
+
+    def right_bumper_pressed(self):
+        self.update()
+        return self.free_distance(1) < 1
+
+    # Location
+    # Positions are reported rounded to the nearest mm as the platform does, or to the hundredth of an inch
+    def location_position(self, axis, units):
+        self.update()
+        position = self.origin[0] + self.x_position if axis == X else self.origin[1] + self.y_position
+        if units == INCHES:
+            return round(position / MM_PER_INCH, 2)
+        return int(round(position))
+
+    def location_position_angle(self, units):
+        self.update()
+        return self.heading
+
+
+# The command line interface runs a project against a loaded or generated maze and prints how long the mission took
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description='Run a VEXcode VR project against a simulated wall maze.')
+    parser.add_argument('script', help='the project file to run')
+    parser.add_argument('--maze', help='a maze drawing to load, in the format printed by --show-maze')
+    parser.add_argument('--generate', default='8x8', help='the WIDTHxHEIGHT of a random maze to generate when no maze is loaded')
+    parser.add_argument('--seed', type=int, default=0, help='the seed used to generate the random maze')
+    parser.add_argument('--loops', type=float, default=0.0, help='the fraction of inside walls to remove from the generated maze')
+    parser.add_argument('--cell-length', type=float, default=250, help='the length of a maze cell in mm')
+    parser.add_argument('--start', default='4,0', help='the X,Y cell the robot starts in')
+    parser.add_argument('--heading', type=float, default=0, help='the heading the robot starts at in degrees')
+    parser.add_argument('--drive-speed', type=float, default=200, help='the drive speed in mm per second at 100%% velocity')
+    parser.add_argument('--turn-speed', type=float, default=75, help='the turn speed in degrees per second at 100%% velocity')
+    parser.add_argument('--time-limit', type=float, default=None, help='the simulated seconds after which the project is stopped')
+    parser.add_argument('--echo', action='store_true', help='print the project output as it runs')
+    parser.add_argument('--show-maze', action='store_true', help='print the maze before running the project')
+    parser.add_argument('--profile', type=int, default=0, metavar='N', help='profile the project and print the N most expensive functions')
+    parser.add_argument('--record', metavar='LOG', help='record the drivetrain commands and sensor readings to a log for vexcode.recorder to replay')
+    options = parser.parse_args(arguments)
+
+    if options.maze:
+        maze = WallMaze.load(options.maze)
+    else:
+        width, height = (int(size) for size in options.generate.lower().split('x'))
+        maze = WallMaze.generate(width, height, options.seed, options.loops)
+    if options.show_maze:
+        print(maze.to_text())
+
+    start = tuple(int(position) for position in options.start.split(','))
+    simulator = Simulator(maze, cell_length=options.cell_length, start_cell=start, start_heading=options.heading,
+                          drive_speed=options.drive_speed, turn_speed=options.turn_speed, time_limit=options.time_limit, echo=options.echo)
+
+    # When recording, the project talks to a recorder which passes every call on to the simulator
+    project_backend = simulator
+    if options.record:
+        from vexcode.recorder import Recorder
+        project_backend = Recorder(simulator)
+
+    profiler = None
+    if options.profile:
+        import cProfile
+        profiler = cProfile.Profile()
+    run_script(options.script, project_backend, profiler)
+
+    if options.record:
+        project_backend.save(options.record)
+
+    if not options.echo:
+        print('\n'.join(simulator.console))
+    print()
+    print('Stopped: %s' % (simulator.scheduler.stop_reason or 'project finished'))
+    print('Mission time: %.1f s' % simulator.elapsed)
+    print('CPU time: %.3f s' % project_backend.cpu_seconds)
+    for name, value in simulator.report().items():
+        if name != 'mission_seconds':
+            print('%s: %s' % (name.replace('_', ' ').capitalize(), round(value, 1)))
+    if profiler is not None:
+        import pstats
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(options.profile)
+
+
+if __name__ == '__main__':
+    main()